@@ -1,43 +1,40 @@
 #!/usr/bin/env python3
-import csv
 import matplotlib.pyplot as plt
 import numpy as np
 
 CSV_PATH = "build/window_cooling_experiments/sa_window_cooling_results.csv"
 OUT_PNG = "build/window_cooling_experiments/sa_window_cooling_pareto.png"
 
-def compute_pareto_front(points):
+def compute_pareto_front(runtimes, hpwls):
     """
-    points = [(runtime, hpwl, idx)]
+    runtimes, hpwls = parallel 1-D arrays
     Returns indices on the Pareto frontier (min HPWL for increasing runtime)
     """
-    points = sorted(points, key=lambda x: x[0])  # sort by runtime ascending
-    pareto = []
-    best_hpwl = float('inf')
-    for rt, hpwl, idx in points:
-        if hpwl < best_hpwl:
-            best_hpwl = hpwl
-            pareto.append(idx)
-    return pareto
+    if len(runtimes) == 0:
+        return []
+    order = np.argsort(runtimes, kind="stable")  # sort by runtime ascending
+    cummin = np.minimum.accumulate(hpwls[order])
+    # Keep only strict improvements over the best HPWL seen so far
+    frontier = np.concatenate(([True], np.diff(cummin) < 0))
+    return order[frontier].tolist()
 
 # -------------------------------------------------------
 # Load CSV
 # -------------------------------------------------------
-rows = []
-with open(CSV_PATH, newline='') as f:
-    r = csv.DictReader(f)
-    for row in r:
-        if not row.get("final_hpwl") or not row.get("runtime_s"):
-            continue
-        rows.append(row)
+data = np.atleast_1d(np.genfromtxt(
+    CSV_PATH, delimiter=",", names=True, dtype=None, encoding="utf-8"
+))
 
-# Convert to numeric lists
-runtimes   = np.array([float(r["runtime_s"])   for r in rows])
-hpwls      = np.array([float(r["final_hpwl"]) for r in rows])
-labels     = np.array([
-    f"β={r['cooling_rate']}, W={r['w_initial']}"
-    for r in rows
-])
+# Drop incomplete runs (empty cells load as NaN)
+valid = ~(np.isnan(data["runtime_s"]) | np.isnan(data["final_hpwl"]))
+data = data[valid]
+
+runtimes   = data["runtime_s"].astype(float)
+hpwls      = data["final_hpwl"].astype(float)
+labels     = np.char.add(
+    np.char.add("β=", data["cooling_rate"].astype(str)),
+    np.char.add(", W=", data["w_initial"].astype(str)),
+)
 
 # -------------------------------------------------------
 # Remove runtime outliers (>2× median)
@@ -49,17 +46,11 @@ runtimes = runtimes[keep]
 hpwls = hpwls[keep]
 labels = labels[keep]
 
-# Rebuild list
-points = [(runtimes[i], hpwls[i], i) for i in range(len(runtimes))]
-
 # -------------------------------------------------------
 # Compute Pareto Frontier
 # -------------------------------------------------------
-pareto_idx = compute_pareto_front(points)
-pareto_pts = sorted(
-    [(runtimes[i], hpwls[i], i) for i in pareto_idx],
-    key=lambda x: x[0]
-)
+pareto_idx = compute_pareto_front(runtimes, hpwls)
+pareto_pts = [(runtimes[i], hpwls[i], i) for i in pareto_idx]
 
 # -------------------------------------------------------
 # Plot
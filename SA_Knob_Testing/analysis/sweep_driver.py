@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+sweep_driver.py
+
+Shared driver for the SA knob sweeps (HPWL_Analysis*.py).
+
+Each sweep script only describes its experiment as a spec dict:
+
+    spec = {
+        "name":        "window_cooling",                    # log tag
+        "out_dir":     "build/window_cooling_experiments",  # maps/stats/CSV
+        "csv_name":    "sa_window_cooling_results.csv",
+        "fieldnames":  [...],                               # CSV columns
+        "param_grid":  {"cooling_rate": [...], "w_initial": [...]},
+        "fixed_cfg":   {"max_iterations": 200000},          # SAConfig overrides
+        "seeds":       1,                                   # seeds per grid point
+        "run_name":    lambda row: f"alpha{row['cooling_rate']}_seed{row['seed']}",
+        "warm_start":  False,                               # optional, see below
+    }
+
+param_grid / fixed_cfg keys are SAConfig attribute names. A CSV column is
+filled from the run's config, its stats, or one of config_id / seed /
+runtime_s / run_time_s / initial_hpwl / final_hpwl / warm_started.
+
+With "warm_start": True, grid points that differ only in the last
+param_grid entry (same seed) form a chain run sequentially in one
+worker, each run starting from the previous run's best placement
+instead of greedy. "warm_start_max_gap" (optional) restarts a chain
+from greedy when that parameter jumps by more than the given amount,
+and "warm_start_max_temp" (optional) keeps runs whose initial_temp is
+above it on greedy, since a hot start would undo the inherited
+placement anyway. initial_hpwl then reports the HPWL the run actually
+started from.
+
+Fabric/design loading, greedy placement and the worker pool are set up
+once by run_sweeps() and shared by every spec passed to it, so running
+several sweeps in one process only pays for those steps once.
+
+Usage:
+    python sweep_driver.py           # run all three sweeps back to back
+"""
+
+import csv
+import os
+import time
+import json
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional; falls back to stdlib json
+    orjson = None
+
+from build_fabric_db import build_fabric_db
+from parse_design import parse_design_json
+from placer import initial_placement, calculate_hpwl, write_map_file
+from optimized import simulated_annealing, SAConfig
+
+# ===================================================================
+
+# DEFAULTS
+
+# ===================================================================
+
+DESIGN_JSON = "designs/6502_mapped.json"
+FABRIC_ARGS = ("fabric/fabric_cells.yaml", "fabric/pins.yaml", "fabric/fabric.yaml")
+
+MASTER_SEED = 42             # entropy for the per-run seed vector
+CSV_BUFFER_BYTES = 1 << 20   # large block buffer for the results CSV
+ROW_BATCH = 8                # rows queued before each writerows() call
+WRITE_QUEUE_SIZE = 32        # results buffered for the writer thread
+
+# ===================================================================
+
+# HELPERS
+
+# ===================================================================
+
+def _write_stats(path, payload):
+    """Write a run's stats payload as compact JSON (orjson when available)."""
+    if orjson is not None:
+        Path(path).write_bytes(orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        Path(path).write_text(json.dumps(payload, separators=(",", ":")))
+
+
+def _completed_runs(path, resume_keys):
+    """Return the resume_keys tuples already recorded in an existing results CSV."""
+    if not Path(path).exists():
+        return set()
+    with open(path, newline="") as f:
+        return {
+            tuple(float(r[k]) for k in resume_keys)
+            for r in csv.DictReader(f)
+            if all(r.get(k) for k in resume_keys)
+        }
+
+
+def _writer_worker(q, writer, fabric_db, errors):
+    """
+    Background writer: drains (run_path, row, best_place, payload) items from q,
+    writing the .map, the stats JSON and (batched) the CSV row, until a
+    None sentinel arrives. Exceptions are collected into errors.
+    """
+    pending_rows = []
+    while True:
+        item = q.get()
+        try:
+            if item is None:
+                writer.writerows(pending_rows)
+                return
+            run_path, row, best_place, payload = item
+            write_map_file(best_place, fabric_db, filename=run_path.with_name(run_path.name + ".map"))
+            _write_stats(run_path.with_name(run_path.name + "_stats.json"), payload)
+
+            # Rows are flushed to the CSV in batches
+            pending_rows.append(row)
+            if len(pending_rows) >= ROW_BATCH:
+                writer.writerows(pending_rows)
+                pending_rows.clear()
+        except Exception as e:
+            errors.append(e)
+        finally:
+            q.task_done()
+
+
+def _run_key(run, resume_keys):
+    """Return a run's resume key, comparable with _completed_runs() entries."""
+    values = dict(run["params"], seed=run["seed"])
+    return tuple(float(values[k]) for k in resume_keys)
+
+
+def _build_runs(spec):
+    """Expand a spec into a list of run descriptors, one per grid point and seed."""
+    param_names = list(spec["param_grid"])
+    points = [
+        (config_id, dict(zip(param_names, values)), seed)
+        for config_id, values in enumerate(product(*spec["param_grid"].values()), start=1)
+        for seed in range(spec.get("seeds", 1))
+    ]
+
+    # Per-run seeds come from one master SeedSequence, indexed by grid position
+    run_seeds = np.random.SeedSequence(spec.get("master_seed", MASTER_SEED)).generate_state(len(points))
+
+    runs = []
+    for i, (config_id, params, seed) in enumerate(points):
+        overrides = dict(spec.get("fixed_cfg", {}))
+        overrides.update(params)
+        if "prob_refine" in params:
+            overrides.setdefault("prob_explore", 1.0 - params["prob_refine"])
+        overrides["seed"] = int(run_seeds[i])
+        runs.append({
+            "config_id": config_id,
+            "params": params,
+            "seed": seed,
+            "overrides": overrides,
+        })
+    return runs
+
+
+# ===================================================================
+
+# WORKER
+
+# ===================================================================
+
+# Per-process state, populated once by _init_worker so the databases are
+# pickled once per worker rather than once per task.
+_worker_state = {}
+
+
+def _init_worker(fabric_db, logical_db, netlist_graph, greedy_place):
+    _worker_state["fabric_db"] = fabric_db
+    _worker_state["logical_db"] = logical_db
+    _worker_state["netlist_graph"] = netlist_graph
+    _worker_state["greedy_place"] = greedy_place
+
+
+def _run_sa(label, overrides, start_place):
+    """Run one SA configuration; returns (config_dict, stats, runtime_s, best_place)."""
+    cfg = SAConfig()
+    for key, value in overrides.items():
+        setattr(cfg, key, value)
+
+    print(f"[RUN] {label}")
+
+    # simulated_annealing copies its starting placement, so it is shared as-is
+    t0 = time.time()
+    best_place, stats = simulated_annealing(
+        _worker_state["fabric_db"], _worker_state["logical_db"],
+        _worker_state["netlist_graph"], start_place, cfg
+    )
+    runtime = time.time() - t0
+    return cfg.__dict__, stats, runtime, best_place
+
+
+def run_chain(args):
+    """
+    Run a chain of SA configurations in order. With warm start enabled,
+    each run starts from the previous run's best placement (unless the
+    chained parameter jumps by more than max_gap); otherwise from greedy.
+    Returns a list of (config_dict, stats, runtime_s, best_place, warm).
+    """
+    warm_start, max_gap, chain = args
+    results = []
+    prev_best = prev_value = None
+    for label, overrides, value in chain:
+        warm = (warm_start and prev_best is not None
+                and (max_gap is None or abs(value - prev_value) <= max_gap))
+        start_place = prev_best if warm else _worker_state["greedy_place"]
+        config, stats, runtime, best_place = _run_sa(label, overrides, start_place)
+        results.append((config, stats, runtime, best_place, warm))
+        prev_best, prev_value = best_place, value
+    return results
+
+
+# ===================================================================
+
+# DRIVER
+
+# ===================================================================
+
+def load_inputs(design_json=DESIGN_JSON, fabric_args=FABRIC_ARGS):
+    """Load fabric/design and compute the greedy starting placement once."""
+    print("Loading inputs...")
+    fabric_db = build_fabric_db(*fabric_args)
+    logical_db, netlist_graph = parse_design_json(design_json)
+
+    print("Computing greedy placement...")
+    greedy_place = initial_placement(fabric_db, logical_db, netlist_graph)
+    greedy_hpwl = calculate_hpwl(netlist_graph, greedy_place, logical_db)
+    print(f"Greedy HPWL = {greedy_hpwl:.2f}")
+
+    return {
+        "fabric_db": fabric_db,
+        "logical_db": logical_db,
+        "netlist_graph": netlist_graph,
+        "greedy_place": greedy_place,
+        "greedy_hpwl": greedy_hpwl,
+    }
+
+
+def run_sweep(spec, inputs=None, executor=None):
+    """
+    Run every (grid point, seed) of one sweep spec and write its CSV,
+    placement maps and per-run stats. Runs already present in the CSV
+    are skipped, so an interrupted sweep resumes where it stopped.
+
+    inputs / executor come from run_sweeps() when several sweeps share
+    one process; when omitted they are created for this sweep alone.
+    """
+    if inputs is None:
+        inputs = load_inputs()
+    if executor is None:
+        with _make_executor(inputs) as executor:
+            return run_sweep(spec, inputs, executor)
+
+    name = spec["name"]
+    out_path = Path(spec["out_dir"])
+    out_path.mkdir(parents=True, exist_ok=True)
+    csv_path = out_path / spec["csv_name"]
+    fieldnames = spec["fieldnames"]
+    resume_keys = tuple(spec.get("resume_keys", (*spec["param_grid"], "seed")))
+
+    runs = _build_runs(spec)
+
+    # Resume: skip runs already recorded in the results CSV
+    done = _completed_runs(csv_path, resume_keys)
+    if done:
+        runs = [run for run in runs if _run_key(run, resume_keys) not in done]
+        print(f"Resuming: {len(done)} runs already in {csv_path}, {len(runs)} remaining")
+
+    # Runs starting hotter than warm_start_max_temp always start from greedy
+    max_temp = spec.get("warm_start_max_temp")
+    default_temp = SAConfig().initial_temp
+
+    def warm_ok(run):
+        return max_temp is None or run["overrides"].get("initial_temp", default_temp) <= max_temp
+
+    # Chains of runs executed back to back in one worker. Without warm
+    # start every run is its own chain; with it, runs sharing all but the
+    # last grid parameter (and the seed) are chained along that parameter.
+    # Runs too hot to warm-start stay on their own, so they run in parallel
+    warm_start = spec.get("warm_start", False)
+    last_param = list(spec["param_grid"])[-1]
+    chains = {}
+    for run in runs:
+        if warm_start and warm_ok(run):
+            chain_key = (tuple(v for k, v in run["params"].items() if k != last_param), run["seed"])
+        else:
+            chain_key = len(chains)
+        chains.setdefault(chain_key, []).append(run)
+    chains = list(chains.values())
+
+    tasks = [
+        (warm_start, spec.get("warm_start_max_gap"), [
+            (f"{name} " + ", ".join(f"{k}={v}" for k, v in run["params"].items()) + f", seed={run['seed']}",
+             run["overrides"], run["params"][last_param])
+            for run in chain
+        ])
+        for chain in chains
+    ]
+
+    with open(csv_path, "a" if done else "w", newline="", buffering=CSV_BUFFER_BYTES) as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        if not done:
+            writer.writeheader()
+
+        # Map/stats/CSV writes happen on one background thread so the next
+        # result can be collected (and SA dispatched) while I/O is pending
+        write_q = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        errors = []
+        writer_thread = threading.Thread(
+            target=_writer_worker, args=(write_q, writer, inputs["fabric_db"], errors), daemon=True
+        )
+        writer_thread.start()
+
+        finished = (
+            (run, result)
+            for chain, results in zip(chains, executor.map(run_chain, tasks))
+            for run, result in zip(chain, results)
+        )
+        # The sentinel and join run even if a worker raised, so rows already
+        # queued reach the CSV before it is closed under the writer thread
+        try:
+            for run, (config, stats, runtime, best_place, warm) in finished:
+                values = dict(config)
+                values.update(stats)
+                values.update({
+                    "config_id": run["config_id"],
+                    "seed": run["seed"],
+                    # Raw floats: full precision for the Pareto/plot scripts
+                    "runtime_s": runtime,
+                    "run_time_s": runtime,
+                    "initial_hpwl": stats["initial_cost"],
+                    "final_hpwl": stats["best_cost"],
+                    "warm_started": warm,
+                })
+                row = {k: values.get(k) for k in fieldnames}
+
+                # Hand placement map, stats JSON and CSV row to the writer thread
+                run_path = out_path / spec["run_name"](row)
+                write_q.put((run_path, row, best_place, {"stats": stats, "config": config}))
+        finally:
+            write_q.put(None)
+            writer_thread.join()
+        if errors:
+            raise errors[0]
+
+    print(f"\n[{name}] sweep finished! Results saved to: {csv_path}")
+    return csv_path
+
+
+def _make_executor(inputs):
+    return ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        initializer=_init_worker,
+        initargs=(inputs["fabric_db"], inputs["logical_db"],
+                  inputs["netlist_graph"], inputs["greedy_place"])
+    )
+
+
+def run_sweeps(specs, design_json=DESIGN_JSON, fabric_args=FABRIC_ARGS):
+    """Run several sweep specs sharing one input load and one worker pool."""
+    inputs = load_inputs(design_json, fabric_args)
+    with _make_executor(inputs) as executor:
+        return [run_sweep(spec, inputs, executor) for spec in specs]
+
+
+if __name__ == "__main__":
+    from HPWL_Analysis_1 import SPEC as GRID_SPEC
+    from HPWL_Analysis2 import SPEC as REFINE_TEMP_SPEC
+    from HPWL_Analysis_3 import SPEC as WINDOW_COOLING_SPEC
+
+    run_sweeps([GRID_SPEC, REFINE_TEMP_SPEC, WINDOW_COOLING_SPEC])
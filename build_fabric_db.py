@@ -1,15 +1,32 @@
 # build_fabric_db.py
 import yaml
 import json
+import os
 import sys
 import re
 
+from db_cache import input_signature, cache_file, load_cached, store_cached, advise_sequential
+
+# Use the libyaml-backed loader/dumper when PyYAML was built with it
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# Patterns used while normalizing cell definitions / tile cells
+_KEY_CLEAN_RE = re.compile(r"[:\s'\{].*")
+_WIDTH_RE = re.compile(r"width_sites[^\d]*(\d+)")
+_TEMPLATE_RE = re.compile(r'(R[0-3]_.+)')
+
+# Part of the fabric_db cache signature; bump whenever _build_fabric_db's
+# output changes so caches written by older code are rebuilt
+FABRIC_DB_CACHE_VERSION = 1
+
 
 def load_yaml(file_path):
     """Safely loads a YAML file."""
     try:
         with open(file_path, 'r') as f:
-            return yaml.safe_load(f)
+            advise_sequential(f)
+            return yaml.load(f, Loader=YAML_LOADER)
     except FileNotFoundError:
         print(f"Error: File not found - {file_path}")
         sys.exit(1)
@@ -18,8 +35,32 @@ def load_yaml(file_path):
         sys.exit(1)
 
 
-def build_fabric_db(fabric_cells_path, pins_path, fabric_def_path):
-    """Merges fabric cell placement, pin placement data, and cell dimensions."""
+def build_fabric_db(fabric_cells_path, pins_path, fabric_def_path, cache_path=None, use_cache=True):
+    """
+    Merges fabric cell placement, pin placement data, and cell dimensions.
+
+    The merged database is pickled to cache_path (default: under build/.cache,
+    keyed by the three input paths) and reused while the YAML inputs and
+    FABRIC_DB_CACHE_VERSION are unchanged.
+    """
+    if cache_path is None:
+        cache_path = cache_file("fabric_db", fabric_cells_path, pins_path, fabric_def_path)
+    signature = (input_signature(fabric_cells_path, pins_path, fabric_def_path,
+                                 version=FABRIC_DB_CACHE_VERSION)
+                 if use_cache else None)
+
+    fabric_db = load_cached(cache_path, signature)
+    if fabric_db is not None:
+        print(f"Loaded fabric database from cache: {cache_path}")
+        return fabric_db
+
+    fabric_db = _build_fabric_db(fabric_cells_path, pins_path, fabric_def_path)
+    store_cached(cache_path, signature, fabric_db)
+    return fabric_db
+
+
+def _build_fabric_db(fabric_cells_path, pins_path, fabric_def_path):
+    """Parses the fabric YAML files and builds the merged database."""
     fabric_cells_data = load_yaml(fabric_cells_path)
     pins_data = load_yaml(pins_path)
     fabric_def_data = load_yaml(fabric_def_path)
@@ -53,14 +94,14 @@ def build_fabric_db(fabric_cells_path, pins_path, fabric_def_path):
     cell_dimensions = {}
     for raw_key, cell_info in cell_definitions.items():
         # Normalize malformed keys
-        cell_type = re.sub(r"[:\s'\{].*", "", raw_key).strip()
+        cell_type = _KEY_CLEAN_RE.sub("", raw_key).strip()
 
         # If key contains inline width data, extract it directly
         if not isinstance(cell_info, dict):
             # Attempt to extract numeric width_sites from malformed strings
-            match = re.search(r"width_sites[^\d]*(\d+)", raw_key)
+            match = _WIDTH_RE.search(raw_key)
             if not match:
-                match = re.search(r"width_sites[^\d]*(\d+)", str(cell_info))
+                match = _WIDTH_RE.search(str(cell_info))
             if match:
                 width_sites = int(match.group(1))
                 cell_info = {"width_sites": width_sites}
@@ -100,7 +141,33 @@ def build_fabric_db(fabric_cells_path, pins_path, fabric_def_path):
 
     # Enrich cells_by_tile with cell_type and dimensions
     enriched_cells_by_tile = {}
-    template_pattern = re.compile(r'(R[0-3]_.+)')
+    template_info = {}
+
+    def _resolve_template(template_name):
+        """Return the cell_type/dimension fields shared by every cell of a template."""
+        fields = {}
+        # Look up cell_type from template_name
+        if template_name in template_to_cell_type:
+            cell_type = template_to_cell_type[template_name]
+            fields["cell_type"] = cell_type
+
+            # Add dimensions if available
+            if cell_type in cell_dimensions:
+                dims = cell_dimensions[cell_type]
+                fields["width_sites"] = dims["width_sites"]
+                fields["width_um"] = dims["width_um"]
+                fields["height_um"] = dims["height_um"]
+            else:
+                # Provide fallback for missing TAP cell types
+                if "tapvpwrvgnd" in cell_type.lower():
+                    fields["width_sites"] = 1
+                    fields["width_um"] = round(1 * site_width, 2)
+                    fields["height_um"] = site_height
+                else:
+                    print(f"Warning: No dimensions found for cell type '{cell_type}'")
+        else:
+            print(f"Warning: No cell_type mapping found for template '{template_name}'")
+        return fields
 
     for tile_key, tile_data in cells_by_tile.items():
         enriched_cells = []
@@ -113,8 +180,8 @@ def build_fabric_db(fabric_cells_path, pins_path, fabric_def_path):
                 cell_name = str(cell)
                 enriched_cell = {"name": cell_name}
 
-            # Extract template name using regex
-            match = template_pattern.search(cell_name)
+            # Extract template name using the precompiled regex
+            match = _TEMPLATE_RE.search(cell_name)
             if not match:
                 enriched_cells.append(enriched_cell)
                 continue
@@ -122,27 +189,12 @@ def build_fabric_db(fabric_cells_path, pins_path, fabric_def_path):
             template_name = match.group(1)
             enriched_cell["template_name"] = template_name
 
-            # Look up cell_type from template_name
-            if template_name in template_to_cell_type:
-                cell_type = template_to_cell_type[template_name]
-                enriched_cell["cell_type"] = cell_type
-
-                # Add dimensions if available
-                if cell_type in cell_dimensions:
-                    dims = cell_dimensions[cell_type]
-                    enriched_cell["width_sites"] = dims["width_sites"]
-                    enriched_cell["width_um"] = dims["width_um"]
-                    enriched_cell["height_um"] = dims["height_um"]
-                else:
-                    # Provide fallback for missing TAP cell types
-                    if "tapvpwrvgnd" in cell_type.lower():
-                        enriched_cell["width_sites"] = 1
-                        enriched_cell["width_um"] = round(1 * site_width, 2)
-                        enriched_cell["height_um"] = site_height
-                    else:
-                        print(f"Warning: No dimensions found for cell type '{cell_type}'")
-            else:
-                print(f"Warning: No cell_type mapping found for template '{template_name}'")
+            # Resolve cell_type/dimensions once per template, then reuse
+            template_fields = template_info.get(template_name)
+            if template_fields is None:
+                template_fields = _resolve_template(template_name)
+                template_info[template_name] = template_fields
+            enriched_cell.update(template_fields)
 
             enriched_cells.append(enriched_cell)
 
@@ -163,20 +215,22 @@ def build_fabric_db(fabric_cells_path, pins_path, fabric_def_path):
 if __name__ == "__main__":
     import sys
     
-    # Parse command-line arguments
-    fabric_cells_file = sys.argv[1] if len(sys.argv) > 1 else "fabric/fabric_cells.yaml"
-    pins_file = sys.argv[2] if len(sys.argv) > 2 else "fabric/pins.yaml"
-    fabric_def_file = sys.argv[3] if len(sys.argv) > 3 else "fabric/fabric.yaml"
-    output_yaml = sys.argv[4] if len(sys.argv) > 4 else "fabric/fabric_db.yaml"
-    output_json = sys.argv[5] if len(sys.argv) > 5 else "fabric/fabric_db.json"
+    # Parse command-line arguments (--emit-yaml may appear anywhere)
+    emit_yaml = "--emit-yaml" in sys.argv
+    argv = [arg for arg in sys.argv if arg != "--emit-yaml"]
+    fabric_cells_file = argv[1] if len(argv) > 1 else "fabric/fabric_cells.yaml"
+    pins_file = argv[2] if len(argv) > 2 else "fabric/pins.yaml"
+    fabric_def_file = argv[3] if len(argv) > 3 else "fabric/fabric.yaml"
+    output_yaml = argv[4] if len(argv) > 4 else "fabric/fabric_db.yaml"
+    output_json = argv[5] if len(argv) > 5 else "fabric/fabric_db.json"
     
-    if len(sys.argv) > 1 and sys.argv[1] in ['-h', '--help']:
-        print("Usage: python build_fabric_db.py [fabric_cells] [pins] [fabric_def] [output_yaml] [output_json]")
+    if len(argv) > 1 and argv[1] in ['-h', '--help']:
+        print("Usage: python build_fabric_db.py [--emit-yaml] [fabric_cells] [pins] [fabric_def] [output_yaml] [output_json]")
         print("\nDefaults:")
         print("  fabric_cells:  fabric/fabric_cells.yaml")
         print("  pins:          fabric/pins.yaml")
         print("  fabric_def:    fabric/fabric.yaml")
-        print("  output_yaml:   fabric/fabric_db.yaml")
+        print("  output_yaml:   fabric/fabric_db.yaml (only written with --emit-yaml)")
         print("  output_json:   fabric/fabric_db.json")
         print("\nExample:")
         print("  python build_fabric_db.py fabric/fabric_cells.yaml fabric/pins.yaml fabric/fabric.yaml")
@@ -184,12 +238,13 @@ if __name__ == "__main__":
 
     db = build_fabric_db(fabric_cells_file, pins_file, fabric_def_file)
 
-    # Save as YAML
-    with open(output_yaml, "w") as f:
-        yaml.dump(db, f, sort_keys=False, default_flow_style=False, indent=2)
-    print(f"Fabric database written to {output_yaml}")
-
-    # Save as JSON
+    # Save as JSON (compact; this is what downstream tools read)
     with open(output_json, "w") as f:
-        json.dump(db, f, indent=2)
-    print(f"Fabric database also saved as {output_json}")
+        json.dump(db, f, separators=(",", ":"))
+    print(f"Fabric database written to {output_json}")
+
+    # YAML dump is slow and unused downstream, so it is opt-in
+    if emit_yaml:
+        with open(output_yaml, "w") as f:
+            yaml.dump(db, f, Dumper=YAML_DUMPER, sort_keys=False, default_flow_style=False, indent=2)
+        print(f"Fabric database also saved as {output_yaml}")
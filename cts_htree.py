@@ -12,78 +12,385 @@ Usage:
     python cts_htree.py [placement.map] [design_json] [clock_net_name]
 """
 
+import os
+import re
 import sys
 import json
-import math
+import mmap
+from array import array
 from typing import List, Dict, Tuple, Set
 from collections import defaultdict
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 import networkx as nx
+import numpy as np
 from networkx.readwrite import json_graph
 
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # optional; falls back to a bucket grid
+    cKDTree = None
+
+try:
+    import orjson
+except ImportError:  # optional; falls back to stdlib json
+    orjson = None
+
+try:
+    from numba import njit
+except ImportError:  # optional; partition_sinks falls back to NumPy sorting
+    njit = None
+
 from build_fabric_db import build_fabric_db
 from parse_design import parse_design_json
 
 
-def parse_placement_map(placement_file: str) -> Tuple[Dict, Dict]:
+# k-d tree nearest-resource search: initial neighbour count per query, and
+# the claimed fraction of a tree after which it is rebuilt from free points
+KDTREE_K = 8
+KDTREE_REBUILD_FRACTION = 0.25
+
+# Records per orjson/json call when streaming the netlist graph
+NODE_LINK_CHUNK = 4096
+
+# Coordinate dtype of the sink/resource arrays (placement is on a 0.01 grid)
+COORD_DTYPE = np.float32
+
+# placement.map lines: "fabric_cell type x y [...] -> mapped" and
+# "port x y [...]", matched line by line (re.M) straight over the file's
+# bytes. This is the grammar of the old split()-based parser: a line with
+# "->" is a fabric cell whose mapped name is everything up to the next "->"
+# or the end of the line, stripped; coordinates are any token float()
+# accepts (signs, exponents, "_" separators, inf and nan). Lines that do not
+# match (bad numbers, too few fields, blank lines) are skipped. Whitespace
+# is ASCII only and lines end in "\n" or "\r\n".
+_DIGITS = rb'\d(?:_?\d)*'
+_NUM = (rb'[-+]?(?:(?:' + _DIGITS + rb'(?:\.(?:' + _DIGITS + rb')?)?|\.' + _DIGITS + rb')'
+        rb'(?:[eE][-+]?' + _DIGITS + rb')?|(?i:inf(?:inity)?|nan))')
+_WS = rb'[ \t\r\f\v]'
+_TOKEN = rb'(?:(?!->)\S)+'  # a field left of "->"
+_PLACEMENT_LINE_RE = re.compile(
+    rb'^' + _WS + rb'*(?:'
+    # fabric cell: groups 1-5
+    rb'(' + _TOKEN + rb')' + _WS + rb'+(' + _TOKEN + rb')' + _WS + rb'+(' + _NUM + rb')'
+    + _WS + rb'+(' + _NUM + rb')(?:' + _WS + rb'+' + _TOKEN + rb')*' + _WS + rb'*->'
+    + _WS + rb'*(.*?)' + _WS + rb'*(?:->.*)?$'
+    # I/O port: groups 6-8
+    rb'|(?!.*->)(\S+)' + _WS + rb'+(' + _NUM + rb')' + _WS + rb'+(' + _NUM + rb')(?:\s|$))',
+    re.MULTILINE)
+
+# Cell-type classes for CTS: clock sinks, buffer and inverter resources
+CELL_OTHER, CELL_DFF, CELL_BUF, CELL_INV = range(4)
+_DFF_RE = re.compile(r'dfbbp|dff', re.IGNORECASE)
+_BUF_RE = re.compile(r'buf', re.IGNORECASE)
+_INV_RE = re.compile(r'inv', re.IGNORECASE)
+
+
+def write_json(obj, output_file: str):
+    """Write obj as compact JSON (orjson when available; int keys become strings)."""
+    if orjson is not None:
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(output_file, 'w') as f:
+            json.dump(obj, f, separators=(',', ':'))
+
+
+def write_node_link_json(graph: nx.Graph, output_file: str, chunk_size: int = NODE_LINK_CHUNK):
+    """
+    Write graph as node-link JSON, streaming nodes and edges in chunks.
+
+    Produces the same document as json_graph.node_link_data (including the
+    edge-list key this networkx version uses) without building it in memory.
+    Multigraphs fall back to node_link_data.
+    """
+    if graph.is_multigraph():
+        write_json(json_graph.node_link_data(graph), output_file)
+        return
+
+    if orjson is not None:
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+        def dumps(obj) -> bytes:
+            return orjson.dumps(obj, option=options)
+    else:
+        def dumps(obj) -> bytes:
+            return json.dumps(obj, separators=(',', ':')).encode()
+
+    # Top-level layout ({"directed", "multigraph", "graph", nodes, edges})
+    # taken from an empty graph of the same class
+    layout = json_graph.node_link_data(graph.__class__())
+    *header_keys, nodes_key, edges_key = layout
+    header = {k: layout[k] for k in header_keys}
+    header['graph'] = graph.graph
+
+    def write_records(f, records):
+        sep = b''
+        chunk = []
+        for record in records:
+            chunk.append(record)
+            if len(chunk) == chunk_size:
+                f.write(sep + dumps(chunk)[1:-1])
+                sep, chunk = b',', []
+        if chunk:
+            f.write(sep + dumps(chunk)[1:-1])
+
+    with open(output_file, 'wb') as f:
+        f.write(dumps(header)[:-1] + b',' + dumps(nodes_key) + b':[')
+        write_records(f, ({**data, 'id': n} for n, data in graph.nodes(data=True)))
+        f.write(b'],' + dumps(edges_key) + b':[')
+        write_records(f, ({**data, 'source': u, 'target': v}
+                          for u, v, data in graph.edges(data=True)))
+        f.write(b']}')
+
+
+def _partition_kernel(xs, ys, idx, cx, cy):
+    """
+    Counting-sort sink indices idx into quadrants around (cx, cy) in one pass.
+
+    Returns (ordered, counts): ordered holds idx grouped NE, NW, SW, SE
+    (original order kept within each group) and counts the group sizes.
+    Written as plain loops so numba can compile it.
+    """
+    n = idx.shape[0]
+    codes = np.empty(n, dtype=np.int8)
+    counts = np.zeros(4, dtype=np.int64)
+    for k in range(n):
+        i = idx[k]
+        west = xs[i] < cx
+        if ys[i] < cy:
+            c = 2 if west else 3  # SW / SE
+        else:
+            c = 1 if west else 0  # NW / NE
+        codes[k] = c
+        counts[c] += 1
+
+    pos = np.zeros(4, dtype=np.int64)
+    for c in range(1, 4):
+        pos[c] = pos[c - 1] + counts[c - 1]
+
+    ordered = np.empty(n, dtype=idx.dtype)
+    for k in range(n):
+        c = codes[k]
+        ordered[pos[c]] = idx[k]
+        pos[c] += 1
+    return ordered, counts
+
+
+_partition_jit = njit(cache=True)(_partition_kernel) if njit is not None else None
+
+
+class FabricCellStore(Mapping):
+    """
+    Fabric cells from placement.map, stored column-wise.
+
+    Columns: names, type, mapped (lists), x, y (float64 arrays), is_unused
+    (bool array) and kind (cell_kind() class per row, int8 array), with
+    name_to_idx mapping a fabric cell name to its row. Reading store[name]
+    still yields the old per-cell dict ({'type', 'x', 'y', 'mapped',
+    'is_unused'}), built on demand, so code that treated fabric_cells as a
+    dict keeps working. That dict is a fresh copy of the row on every read:
+    treat it as read-only, since editing it does not change the store.
+    Write through store[name] = info or append() instead.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.name_to_idx = {}
+        self.type = []
+        self.mapped = []
+        self._x = array('d')
+        self._y = array('d')
+        self._unused = array('b')
+        self._kind = array('b')
+        self._arrays = None  # (x, y, is_unused, kind) NumPy views, rebuilt after appends
+
+    @classmethod
+    def from_dict(cls, fabric_cells: Dict) -> 'FabricCellStore':
+        """Build a store from the {name: info} dict form."""
+        store = cls()
+        for name, info in fabric_cells.items():
+            store[name] = info
+        return store
+
+    @classmethod
+    def from_columns(cls, names: List[str], types: List[str], xs: List[float],
+                     ys: List[float], mapped: List[str]) -> 'FabricCellStore':
+        """Build a store from parallel column lists in one step."""
+        store = cls()
+        name_to_idx = {name: i for i, name in enumerate(names)}
+        if len(name_to_idx) != len(names):
+            # Repeated names: later rows overwrite earlier ones, as with a dict
+            for row in zip(names, types, xs, ys, mapped):
+                store.append(*row)
+            return store
+
+        store.names = names
+        store.name_to_idx = name_to_idx
+        store.type = types
+        store.mapped = mapped
+        store._x = array('d', xs)
+        store._y = array('d', ys)
+        store._unused = array('b', [m == 'UNUSED' for m in mapped])
+        store._kind = array('b', [cell_kind(t) for t in types])
+        return store
+
+    def append(self, name: str, cell_type: str, x: float, y: float,
+               mapped: str, is_unused: bool = None) -> int:
+        """Add (or overwrite) one fabric cell and return its row index."""
+        if is_unused is None:
+            is_unused = (mapped == 'UNUSED')
+
+        i = self.name_to_idx.get(name)
+        if i is None:
+            i = self.name_to_idx[name] = len(self.names)
+            self.names.append(name)
+            self.type.append(cell_type)
+            self.mapped.append(mapped)
+            self._x.append(x)
+            self._y.append(y)
+            self._unused.append(bool(is_unused))
+            self._kind.append(cell_kind(cell_type))
+        else:
+            self.type[i] = cell_type
+            self.mapped[i] = mapped
+            self._x[i] = x
+            self._y[i] = y
+            self._unused[i] = bool(is_unused)
+            self._kind[i] = cell_kind(cell_type)
+        self._arrays = None
+        return i
+
+    def _columns(self):
+        if self._arrays is None:
+            self._arrays = (np.array(self._x, dtype=np.float64),
+                            np.array(self._y, dtype=np.float64),
+                            np.array(self._unused, dtype=bool),
+                            np.array(self._kind, dtype=np.int8))
+        return self._arrays
+
+    @property
+    def x(self) -> np.ndarray:
+        return self._columns()[0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self._columns()[1]
+
+    @property
+    def is_unused(self) -> np.ndarray:
+        return self._columns()[2]
+
+    @property
+    def kind(self) -> np.ndarray:
+        return self._columns()[3]
+
+    def __getitem__(self, name: str) -> Dict:
+        i = self.name_to_idx[name]
+        return {
+            'type': self.type[i],
+            'x': self._x[i],
+            'y': self._y[i],
+            'mapped': self.mapped[i],
+            'is_unused': bool(self._unused[i])
+        }
+
+    def __setitem__(self, name: str, info: Dict):
+        self.append(name, info['type'], info['x'], info['y'], info['mapped'],
+                    info.get('is_unused'))
+
+    def __contains__(self, name) -> bool:
+        return name in self.name_to_idx
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+def parse_placement_map(placement_file: str) -> Tuple[Dict, 'FabricCellStore']:
     """
     Parse placement.map file and return I/O ports and fabric cells.
 
+    The file is memory-mapped and scanned with one multiline regex
+    (_PLACEMENT_LINE_RE, same grammar as the old split-based parser). Lines
+    whose coordinates float() would reject fail it and are skipped, so no
+    per-field try/except is needed.
+
     Returns:
-        Tuple of (io_ports, fabric_cells)
+        Tuple of (io_ports, fabric_cells); fabric_cells is a FabricCellStore
     """
     io_ports = {}  # I/O port positions
-    fabric_cells = {}  # Fabric cell info
+
+    # Fabric cell columns, gathered first and handed to FabricCellStore at once
+    names, types, xs, ys, mapped = [], [], [], [], []
 
     print(f"Loading placement: {placement_file}")
 
-    with open(placement_file, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
+    # Map the file and scan it in place: no per-line strings, and numbers are
+    # converted straight from bytes (float() accepts them)
+    with open(placement_file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for m in _PLACEMENT_LINE_RE.finditer(mm):
+                    fabric_cell, cell_type, x, y, mapped_cell, port_name, px, py = m.groups()
+                    if fabric_cell is not None:
+                        names.append(fabric_cell.decode())
+                        types.append(cell_type.decode())
+                        xs.append(float(x))
+                        ys.append(float(y))
+                        mapped.append(mapped_cell.decode())
+                    else:
+                        # I/O port line: port_name x y
+                        io_ports[port_name.decode()] = (float(px), float(py))
 
-            # Check if line contains '->' (fabric cell mapping)
-            if '->' in line:
-                parts = line.split('->')
-                left_parts = parts[0].strip().split()
+    fabric_cells = FabricCellStore.from_columns(names, types, xs, ys, mapped)
 
-                if len(left_parts) < 4:
-                    continue
+    print(f"Loaded {len(io_ports)} I/O ports")
+    print(f"Loaded {len(fabric_cells)} fabric cells from placement")
 
-                fabric_cell = left_parts[0]
-                cell_type = left_parts[1]
+    return io_ports, fabric_cells
 
-                try:
-                    x = float(left_parts[2])
-                    y = float(left_parts[3])
-                except (ValueError, IndexError):
-                    continue
 
-                mapped_cell = parts[1].strip()
+@lru_cache(maxsize=None)
+def cell_kind(cell_type: str) -> int:
+    """Classify a cell type as CELL_DFF, CELL_BUF, CELL_INV or CELL_OTHER (memoized per type)."""
+    if _DFF_RE.search(cell_type):
+        return CELL_DFF
+    if _BUF_RE.search(cell_type):
+        return CELL_BUF
+    if _INV_RE.search(cell_type):
+        return CELL_INV
+    return CELL_OTHER
 
-                fabric_cells[fabric_cell] = {
-                    'type': cell_type,
-                    'x': x,
-                    'y': y,
-                    'mapped': mapped_cell,
-                    'is_unused': (mapped_cell == 'UNUSED')
-                }
-            else:
-                # I/O port line: port_name x y
-                parts = line.split()
-                if len(parts) >= 3:
-                    port_name = parts[0]
-                    try:
-                        x = float(parts[1])
-                        y = float(parts[2])
-                        io_ports[port_name] = (x, y)
-                    except ValueError:
-                        continue
 
-    print(f"Loaded {len(io_ports)} I/O ports")
-    print(f"Loaded {len(fabric_cells)} fabric cells from placement")
+def _scan_tile(tile_data: Dict, blocked: Set[str]) -> List[Dict]:
+    """Return the unclaimed buffer/inverter resources of one fabric tile."""
+    resources = []
 
-    return io_ports, fabric_cells
+    for cell in tile_data.get('cells', []):
+        cell_name = cell.get('name')
+
+        # Skip unnamed cells and cells already used in placement
+        if not cell_name or cell_name in blocked:
+            continue
+
+        # Check if it's a buffer or inverter using BUF or INV keywords
+        kind = cell_kind(cell.get('cell_type', ''))
+
+        if kind == CELL_BUF or kind == CELL_INV:
+            resources.append({
+                'name': cell_name,
+                'type': cell.get('cell_type'),
+                'x': cell.get('x', 0),
+                'y': cell.get('y', 0),
+                'claimed': False,
+                'is_buffer': kind == CELL_BUF
+            })
+
+    return resources
 
 
 class HTreeCTS:
@@ -91,6 +398,8 @@ class HTreeCTS:
                  fabric_db: Dict, logical_db: Dict, netlist_graph: nx.Graph):
         """Initialize CTS with placement data, fabric database, and logical netlist."""
         self.io_ports = io_ports
+        if not isinstance(fabric_cells, FabricCellStore):
+            fabric_cells = FabricCellStore.from_dict(fabric_cells)
         self.fabric_cells = fabric_cells
         self.fabric_db = fabric_db
         self.logical_db = logical_db
@@ -105,6 +414,12 @@ class HTreeCTS:
         self.clock_net = None  # Clock net name
         self.clock_net_id = None  # Clock net ID from logical_db
         self.buffer_counter = 0  # Counter for naming buffers
+        self._max_net_id = None  # Highest numeric net ID, scanned on first use
+        self._clk_port_candidates = None  # I/O ports named like a clock, found on first use
+
+        # Sink/resource coordinates as parallel arrays for vectorized lookups
+        self._build_sink_arrays()
+        self._build_resource_arrays()
 
     def augment_fabric_cells_with_unused_ffs(self):
         """
@@ -112,7 +427,7 @@ class HTreeCTS:
         This ensures all FFs in the fabric are available for CTS routing.
         """
         cells_by_tile = self.fabric_db.get('fabric', {}).get('cells_by_tile', {})
-        existing_fabric_cells = set(self.fabric_cells.keys())
+        existing_fabric_cells = self.fabric_cells.name_to_idx
         
         added_count = 0
         for tile_key, tile_data in cells_by_tile.items():
@@ -120,21 +435,12 @@ class HTreeCTS:
                 cell_name = cell.get('name', '')
                 cell_type = cell.get('cell_type', '')
                 
-                # Check if it's a DFF
-                is_dff = 'dfbbp' in cell_type.lower() or 'dff' in cell_type.lower()
-                
                 # Add if it's a DFF and not already in placement map
-                if is_dff and cell_name not in existing_fabric_cells:
+                if cell_kind(cell_type) == CELL_DFF and cell_name not in existing_fabric_cells:
                     x = cell.get('x', 0.0)
                     y = cell.get('y', 0.0)
                     
-                    self.fabric_cells[cell_name] = {
-                        'type': cell_type,
-                        'x': x,
-                        'y': y,
-                        'mapped': 'UNUSED',
-                        'is_unused': True
-                    }
+                    self.fabric_cells.append(cell_name, cell_type, x, y, 'UNUSED', True)
                     added_count += 1
         
         if added_count > 0:
@@ -155,231 +461,417 @@ class HTreeCTS:
             else:
                 print(f"Warning: Clock net '{clock_name}' not found in I/O ports")
 
-        # Look for 'clk' port
-        for port_name in self.io_ports:
-            if 'clk' in port_name.lower():
-                self.clock_net = port_name
-                if port_name in self.logical_db['ports']['inputs']:
-                    self.clock_net_id = self.logical_db['ports']['inputs'][port_name]
-                print(f"Found clock net: {port_name} (net_id: {self.clock_net_id})")
-                return port_name
+        # Look for 'clk' port (candidates found once, in port order)
+        if self._clk_port_candidates is None:
+            self._clk_port_candidates = [p for p in self.io_ports if 'clk' in p.lower()]
+        if self._clk_port_candidates:
+            port_name = self._clk_port_candidates[0]
+            self.clock_net = port_name
+            if port_name in self.logical_db['ports']['inputs']:
+                self.clock_net_id = self.logical_db['ports']['inputs'][port_name]
+            print(f"Found clock net: {port_name} (net_id: {self.clock_net_id})")
+            return port_name
 
         print("Warning: No clock net found")
         return None
 
     def find_sinks(self) -> List[Dict]:
         """Find all DFF cells (clock sinks) from placement (includes all FFs in fabric)."""
-        self.sinks = []
-
-        for fabric_cell, info in self.fabric_cells.items():
-            cell_type = info['type']
-
-            # Check if it's a DFF
-            is_dff = 'dfbbp' in cell_type.lower() or 'dff' in cell_type.lower()
+        store = self.fabric_cells
+
+        # Include ALL DFFs in fabric, whether mapped or unused
+        rows = np.flatnonzero(store.kind == CELL_DFF)
+
+        # Sink arrays come straight from the store's columns
+        self._sink_x = store.x[rows].astype(COORD_DTYPE)
+        self._sink_y = store.y[rows].astype(COORD_DTYPE)
+        self._sink_ids = [store.names[i] for i in rows]
+        self._sink_mapped = [store.mapped[i] for i in rows]
+
+        xs, ys = store.x[rows].tolist(), store.y[rows].tolist()
+        unused = store.is_unused[rows]
+        self.sinks = [
+            {
+                'id': self._sink_ids[k],
+                'type': store.type[i],
+                'x': xs[k],
+                'y': ys[k],
+                'mapped': self._sink_mapped[k],
+                'is_unused': bool(unused[k])
+            }
+            for k, i in enumerate(rows)
+        ]
 
-            if is_dff:
-                # Include ALL DFFs in fabric, whether mapped or unused
-                logical_cell = info['mapped']
+        print(f"Found {len(self.sinks)} DFF sinks (including {int(unused.sum())} unused)")
+        return self.sinks
 
-                sink_info = {
-                    'id': fabric_cell,
-                    'type': cell_type,
-                    'x': info['x'],
-                    'y': info['y'],
-                    'mapped': logical_cell,
-                    'is_unused': info['is_unused']
-                }
-                self.sinks.append(sink_info)
+    def _build_sink_arrays(self):
+        """Mirror self.sinks into NumPy coordinate arrays plus id/name lookups."""
+        n = len(self.sinks)
+        self._sink_x = np.fromiter((s['x'] for s in self.sinks), dtype=COORD_DTYPE, count=n)
+        self._sink_y = np.fromiter((s['y'] for s in self.sinks), dtype=COORD_DTYPE, count=n)
+        self._sink_ids = [s['id'] for s in self.sinks]
+        self._sink_mapped = [s['mapped'] for s in self.sinks]
 
-        print(f"Found {len(self.sinks)} DFF sinks (including {sum(1 for s in self.sinks if s['is_unused'])} unused)")
-        return self.sinks
+    def find_resources(self, workers: int = None) -> List[Dict]:
+        """
+        Find all unused buffer/inverter cells from fabric_db.
 
-    def find_resources(self) -> List[Dict]:
-        """Find all unused buffer/inverter cells from fabric_db."""
+        workers > 1 scans tiles in that many processes; the default scans
+        them in this process.
+        """
         self.resources = []
-        used_cells = set(info['mapped'] for info in self.fabric_cells.values()
-                         if not info['is_unused'])
+
+        # Names that cannot be claimed: logical cells mapped in the placement
+        # and fabric slots the placement marks as used
+        store = self.fabric_cells
+        used = np.flatnonzero(~store.is_unused)
+        blocked = {store.mapped[i] for i in used}
+        blocked.update(store.names[i] for i in used)
 
         # Get cells_by_tile from fabric database
         cells_by_tile = self.fabric_db.get('fabric', {}).get('cells_by_tile', {})
+        tiles = list(cells_by_tile.values())
+
+        # Tiles are independent; with workers > 1 they are scanned in a
+        # process pool (worth it only for very large fabrics, since each
+        # tile's cells are pickled to a worker)
+        if workers and workers > 1 and len(tiles) > 1:
+            chunksize = max(1, len(tiles) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                per_tile = list(ex.map(partial(_scan_tile, blocked=blocked),
+                                       tiles, chunksize=chunksize))
+        else:
+            per_tile = [_scan_tile(tile_data, blocked) for tile_data in tiles]
 
-        for tile_name, tile_data in cells_by_tile.items():
-            cells = tile_data.get('cells', [])
-
-            for cell in cells:
-                cell_name = cell.get('name')
-                cell_type = cell.get('cell_type', '').lower()
-                x = cell.get('x', 0)
-                y = cell.get('y', 0)
-
-                if not cell_name:
-                    continue
-
-                # Skip if this cell is already used in placement
-                if cell_name in used_cells:
-                    continue
-
-                # Check if this fabric cell is in placement and marked as used
-                if cell_name in self.fabric_cells and not self.fabric_cells[cell_name]['is_unused']:
-                    continue
-
-                # Check if it's a buffer or inverter using BUF or INV keywords
-                is_buffer = 'buf' in cell_type
-                is_inverter = 'inv' in cell_type
+        for tile_resources in per_tile:
+            self.resources.extend(tile_resources)
 
-                if is_buffer or is_inverter:
-                    self.resources.append({
-                        'name': cell_name,
-                        'type': cell.get('cell_type'),
-                        'x': x,
-                        'y': y,
-                        'claimed': False,
-                        'is_buffer': is_buffer
-                    })
+        self._build_resource_arrays()
 
         print(f"Found {len(self.resources)} available buffer/inverter resources")
-        print(f"  Buffers: {sum(1 for r in self.resources if r['is_buffer'])}")
-        print(f"  Inverters: {sum(1 for r in self.resources if not r['is_buffer'])}")
+        n_buffers = int(self._res_is_buffer.sum())
+        print(f"  Buffers: {n_buffers}")
+        print(f"  Inverters: {len(self.resources) - n_buffers}")
         return self.resources
 
-    def compute_centroid(self, sinks: List[Dict]) -> Tuple[float, float]:
-        """Calculate geometric center of a list of sinks."""
-        if not sinks:
-            return (0, 0)
+    def _build_resource_arrays(self):
+        """Mirror self.resources into NumPy arrays (x, y, claimed, is_buffer)."""
+        n = len(self.resources)
+        self._res_x = np.fromiter((r['x'] for r in self.resources), dtype=COORD_DTYPE, count=n)
+        self._res_y = np.fromiter((r['y'] for r in self.resources), dtype=COORD_DTYPE, count=n)
+        self._res_claimed = np.fromiter((r['claimed'] for r in self.resources), dtype=bool, count=n)
+        self._res_is_buffer = np.fromiter((r['is_buffer'] for r in self.resources), dtype=bool, count=n)
+        self._res_index = {r['name']: i for i, r in enumerate(self.resources)}
+
+        # Unclaimed count per class (True = buffers, False = inverters)
+        n_buffers = int(self._res_is_buffer.sum())
+        n_claimed_buffers = int((self._res_is_buffer & self._res_claimed).sum())
+        n_claimed = int(self._res_claimed.sum())
+        self._res_free = {True: n_buffers - n_claimed_buffers,
+                          False: (n - n_buffers) - (n_claimed - n_claimed_buffers)}
+
+        # One k-d tree per class, built lazily on first query; without scipy,
+        # one bucket grid per class instead
+        self._res_trees = {True: None, False: None} if cKDTree is not None else None
+        self._res_grids = {True: None, False: None}
+
+    def _build_resource_tree(self, is_buffer: bool) -> Dict:
+        """Build a k-d tree over the unclaimed resources of one class."""
+        idx = np.flatnonzero((self._res_is_buffer == is_buffer) & ~self._res_claimed)
+        points = np.column_stack((self._res_x[idx], self._res_y[idx]))
+        return {'tree': cKDTree(points), 'idx': idx, 'claimed': 0}
+
+    def _build_resource_grid(self, is_buffer: bool) -> Dict:
+        """
+        Bucket the resources of one class into a uniform 2-D grid.
 
-        sum_x = sum(sink['x'] for sink in sinks)
-        sum_y = sum(sink['y'] for sink in sinks)
+        Cells are about sqrt(bbox_area / n) on a side, so each holds O(1)
+        resources (but at least extent / n, so a thin bounding box cannot
+        blow up the cell count). Buckets are stored CSR-style: members of cell c are
+        idx[order[starts[c]:starts[c + 1]]].
+        """
+        idx = np.flatnonzero(self._res_is_buffer == is_buffer)
+        xs = self._res_x[idx].astype(np.float64)
+        ys = self._res_y[idx].astype(np.float64)
+
+        x0, y0 = (float(xs.min()), float(ys.min())) if len(idx) else (0.0, 0.0)
+        width = float(xs.max()) - x0 if len(idx) else 0.0
+        height = float(ys.max()) - y0 if len(idx) else 0.0
+        area = width * height
+        extent = max(width, height)
+        size = max(float(np.sqrt(area / len(idx))), extent / len(idx)) if extent > 0 else 1.0
+
+        nx_cells = int(width // size) + 1
+        ny_cells = int(height // size) + 1
+        gx = np.minimum((xs - x0) // size, nx_cells - 1).astype(np.intp)
+        gy = np.minimum((ys - y0) // size, ny_cells - 1).astype(np.intp)
+        cell = gx * ny_cells + gy
+
+        order = np.argsort(cell, kind='stable')
+        starts = np.searchsorted(cell[order], np.arange(nx_cells * ny_cells + 1))
+        return {'idx': idx[order], 'starts': starts, 'x0': x0, 'y0': y0,
+                'size': size, 'nx': nx_cells, 'ny': ny_cells}
+
+    def _query_resource_grid(self, is_buffer: bool, x: float, y: float):
+        """
+        Return (squared distance, resource index) of the nearest unclaimed
+        resource of one class by scanning grid rings outward from (x, y),
+        or None if the class is exhausted. Ties go to the lowest index.
+        """
+        if self._res_free[is_buffer] == 0:
+            return None
 
-        return (sum_x / len(sinks), sum_y / len(sinks))
+        grid = self._res_grids[is_buffer]
+        if grid is None:
+            grid = self._res_grids[is_buffer] = self._build_resource_grid(is_buffer)
+
+        members, starts = grid['idx'], grid['starts']
+        x0, y0, size = grid['x0'], grid['y0'], grid['size']
+        n_x, n_y = grid['nx'], grid['ny']
+
+        # Query cell (may lie outside the grid); start at the first ring
+        # that reaches the grid
+        qx = int((x - x0) // size)
+        qy = int((y - y0) // size)
+        r = max(0, -qx, qx - (n_x - 1), -qy, qy - (n_y - 1))
+        r_max = max(qx, n_x - 1 - qx, qy, n_y - 1 - qy)
+
+        best = None
+        while r <= r_max:
+            # Cells on the square ring at Chebyshev distance r, clipped
+            gx_lo, gx_hi = max(qx - r, 0), min(qx + r, n_x - 1)
+            gy_lo, gy_hi = max(qy - r, 0), min(qy + r, n_y - 1)
+            chunks = []
+            for gx in range(gx_lo, gx_hi + 1):
+                if gx in (qx - r, qx + r):
+                    gys = range(gy_lo, gy_hi + 1)
+                else:
+                    gys = [gy for gy in (qy - r, qy + r) if gy_lo <= gy <= gy_hi]
+                for gy in gys:
+                    c = gx * n_y + gy
+                    if starts[c] != starts[c + 1]:
+                        chunks.append(members[starts[c]:starts[c + 1]])
+
+            if chunks:
+                cand = np.concatenate(chunks)
+                cand = cand[~self._res_claimed[cand]]
+                if len(cand):
+                    # Same float32 arithmetic as a full scan, so ranking and
+                    # ties match np.argmin over all resources
+                    dx = self._res_x[cand] - x
+                    dy = self._res_y[cand] - y
+                    d2 = dx * dx + dy * dy
+                    k = np.flatnonzero(d2 == d2.min())
+                    hit = (float(d2[k[0]]), int(cand[k].min()))
+                    if best is None or hit < best:
+                        best = hit
+
+            if best is not None:
+                # Anything outside the scanned square is at least this far
+                # (with slack for the float32 rounding of d2)
+                bound = min(x - (x0 + (qx - r) * size), x0 + (qx + r + 1) * size - x,
+                            y - (y0 + (qy - r) * size), y0 + (qy + r + 1) * size - y)
+                if best[0] * (1 + 1e-6) < bound * bound:
+                    return best
+            r += 1
+
+        return best
+
+    def claim_resource(self, resource: Dict):
+        """Mark a resource as claimed (in both the dict and the claimed mask)."""
+        resource['claimed'] = True
+        self._res_claimed[self._res_index[resource['name']]] = True
+
+        is_buffer = resource['is_buffer']
+        self._res_free[is_buffer] -= 1
+        if self._res_trees is not None and self._res_trees[is_buffer] is not None:
+            self._res_trees[is_buffer]['claimed'] += 1
+
+    def compute_centroid(self, idx: np.ndarray) -> Tuple[float, float]:
+        """Calculate geometric center of the sinks at indices idx."""
+        n = len(idx)
+        if n == 0:
+            return (0, 0)
+
+        if n <= 4:
+            # Leaf-sized groups: plain float arithmetic beats two NumPy
+            # reductions. Summing left to right and dividing by n gives the
+            # same result as mean() does for arrays this short.
+            xs = self._sink_x[idx].tolist()
+            ys = self._sink_y[idx].tolist()
+            if n == 1:
+                return (xs[0], ys[0])
+            sx, sy = xs[0], ys[0]
+            for i in range(1, n):
+                sx += xs[i]
+                sy += ys[i]
+            return (sx / n, sy / n)
+
+        return (float(self._sink_x[idx].mean(dtype=np.float64)),
+                float(self._sink_y[idx].mean(dtype=np.float64)))
 
     def find_nearest_resource(self, x: float, y: float,
                               prefer_buffer: bool = True) -> Dict:
         """Find the nearest unclaimed buffer/inverter to given coordinates."""
-        min_dist = float('inf')
-        nearest = None
-
-        for resource in self.resources:
-            if resource['claimed']:
-                continue
+        # Prefer buffers over inverters if specified; fall back to inverters
+        only_buffers = prefer_buffer and self._res_free[True] > 0
 
-            # Prefer buffers over inverters if specified
-            if prefer_buffer and not resource['is_buffer']:
-                continue
-
-            dx = resource['x'] - x
-            dy = resource['y'] - y
-            dist = math.sqrt(dx * dx + dy * dy)
-
-            if dist < min_dist:
-                min_dist = dist
-                nearest = resource
-
-        # If no buffer found and we were preferring buffers, try inverters
-        if nearest is None and prefer_buffer:
-            return self.find_nearest_resource(x, y, prefer_buffer=False)
-
-        return nearest
+        if self._res_trees is not None:
+            classes = (True,) if only_buffers else (True, False)
+            hits = [hit for hit in (self._query_resource_tree(c, x, y) for c in classes) if hit]
+            return self.resources[min(hits)[1]] if hits else None
 
-    def partition_sinks(self, sinks: List[Dict], cx: float, cy: float) -> List[List[Dict]]:
-        """Partition sinks into quadrants around centroid (cx, cy)."""
-        quadrants = [[], [], [], []]  # NE, NW, SW, SE
+        classes = (True,) if only_buffers else (True, False)
+        hits = [hit for hit in (self._query_resource_grid(c, x, y) for c in classes) if hit]
+        return self.resources[min(hits)[1]] if hits else None
 
-        for sink in sinks:
-            dx = sink['x'] - cx
-            dy = sink['y'] - cy
+    def _query_resource_tree(self, is_buffer: bool, x: float, y: float):
+        """
+        Return (squared distance, resource index) of the nearest unclaimed
+        resource of one class using its k-d tree, or None if the class is
+        exhausted. Ties go to the lowest index, as in a full scan.
+        """
+        if self._res_free[is_buffer] == 0:
+            return None
 
-            if dx >= 0 and dy >= 0:
-                quadrants[0].append(sink)  # NE
-            elif dx < 0 and dy >= 0:
-                quadrants[1].append(sink)  # NW
-            elif dx < 0 and dy < 0:
-                quadrants[2].append(sink)  # SW
-            else:
-                quadrants[3].append(sink)  # SE
+        entry = self._res_trees[is_buffer]
+        if entry is None or entry['claimed'] > KDTREE_REBUILD_FRACTION * len(entry['idx']):
+            entry = self._res_trees[is_buffer] = self._build_resource_tree(is_buffer)
+
+        tree, idx = entry['tree'], entry['idx']
+        k = min(KDTREE_K, len(idx))
+        while True:
+            dist, pos = tree.query((x, y), k=k)
+            free = ~self._res_claimed[idx[np.atleast_1d(pos)]]
+            if free.any():
+                d = float(np.atleast_1d(dist)[np.argmax(free)])
+                break
+            if k == len(idx):
+                return None
+            # All k neighbours already claimed: widen the search
+            k = min(k * 4, len(idx))
+
+        # Points tied with the first unclaimed hit may lie past the k-th
+        # neighbour, so collect everything within d and rank it as the
+        # grid/scan does. The slack covers float32 rounding of x - res_x,
+        # which is relative to the coordinates rather than to d
+        slack = 4 * float(np.finfo(COORD_DTYPE).eps) * (abs(x) + abs(y) + d)
+        cand = idx[tree.query_ball_point((x, y), r=d + slack)]
+        cand = cand[~self._res_claimed[cand]]
+        dx = self._res_x[cand] - x
+        dy = self._res_y[cand] - y
+        d2 = dx * dx + dy * dy
+        ties = np.flatnonzero(d2 == d2.min())
+        return (float(d2[ties[0]]), int(cand[ties].min()))
+
+    def partition_sinks(self, idx: np.ndarray, cx: float, cy: float) -> List[np.ndarray]:
+        """Partition sink indices into quadrants around centroid (cx, cy)."""
+        if _partition_jit is not None:
+            ordered, counts = _partition_jit(self._sink_x, self._sink_y, idx, cx, cy)
+            quadrants = np.split(ordered, np.cumsum(counts)[:-1])
+            return [q for q in quadrants if len(q)]
+
+        west = (self._sink_x[idx] < cx).view(np.uint8)
+        south = (self._sink_y[idx] < cy).view(np.uint8)
+
+        # Quadrant code in output order: NE=0, NW=1, SW=2, SE=3
+        codes = (south << 1) | (west ^ south)
+
+        # Stable sort keeps the original sink order within each quadrant
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], [1, 2, 3])
+        quadrants = np.split(idx[order], bounds)
 
         # Filter out empty quadrants
-        return [q for q in quadrants if q]
+        return [q for q in quadrants if len(q)]
 
-    def build_htree_recursive(self, sinks: List[Dict], level: int = 0,
-                              parent_buffer: str = "clk_root") -> Dict:
+    def build_htree(self, idx: np.ndarray, level: int = 0,
+                    parent_buffer: str = "clk_root") -> Dict:
         """
-        Recursively build H-Tree structure.
+        Build H-Tree structure with an explicit stack (no recursion).
+
+        idx holds indices into self.sinks (see find_sinks).
 
         At each level:
         1. Find centroid of sinks
         2. Claim nearest buffer at centroid
         3. Split sinks into quadrants (X-pattern)
-        4. Recurse on each quadrant
+        4. Push each quadrant as a child
+
+        Children are pushed in reverse so they pop in quadrant order; the
+        claim sequence (and therefore buffer choice) is the same depth-first
+        pre-order the recursive version used.
         """
-        if not sinks:
+        if len(idx) == 0:
             return None
 
-        indent = "  " * level
+        sink_ids, sink_mapped = self._sink_ids, self._sink_mapped
+
+        root = None
+        # (sink indices, level, parent buffer name, parent tree node)
+        stack = [(idx, level, parent_buffer, None)]
 
-        # Base case: few enough sinks to connect directly
-        if len(sinks) <= 4 or level > 8:  # Prevent infinite recursion
-            cx, cy = self.compute_centroid(sinks)
+        while stack:
+            idx, level, parent_buffer, parent_node = stack.pop()
+            indent = "  " * level
+
+            cx, cy = self.compute_centroid(idx)
             buffer = self.find_nearest_resource(cx, cy)
 
+            # Leaf: few enough sinks to connect directly
+            is_leaf = len(idx) <= 4 or level > 8  # Prevent unbounded depth
+
             tree_node = {
                 'level': level,
                 'parent': parent_buffer,
-                'sinks': [s['id'] for s in sinks],
-                'sink_logical_names': [s['mapped'] for s in sinks],
-                'centroid': (cx, cy),
-                'buffer': None
             }
+            if is_leaf:
+                rows = idx.tolist()
+                tree_node['sinks'] = [sink_ids[i] for i in rows]
+                tree_node['sink_logical_names'] = [sink_mapped[i] for i in rows]
+            tree_node['centroid'] = (cx, cy)
+            tree_node['buffer'] = None
+            if not is_leaf:
+                tree_node['children'] = []
+
+            if parent_node is None:
+                root = tree_node
+            else:
+                parent_node['children'].append(tree_node)
 
             if buffer:
-                buffer['claimed'] = True
-                tree_node['buffer'] = buffer['name']
+                self.claim_resource(buffer)
+                buffer_name = buffer['name']
+                tree_node['buffer'] = buffer_name
                 tree_node['buffer_pos'] = (buffer['x'], buffer['y'])
                 tree_node['buffer_type'] = buffer['type']
 
-                print(f"{indent}Level {level}: Claimed {buffer['type']} '{buffer['name']}' "
-                      f"at ({buffer['x']:.2f}, {buffer['y']:.2f}) for {len(sinks)} sinks")
+                if is_leaf:
+                    print(f"{indent}Level {level}: Claimed {buffer['type']} '{buffer_name}' "
+                          f"at ({buffer['x']:.2f}, {buffer['y']:.2f}) for {len(idx)} sinks")
+                else:
+                    print(f"{indent}Level {level}: Claimed {buffer['type']} '{buffer_name}' "
+                          f"at ({buffer['x']:.2f}, {buffer['y']:.2f}) - partitioning {len(idx)} sinks")
+            elif is_leaf:
+                print(f"{indent}Level {level}: WARNING - No buffer available for {len(idx)} sinks")
+                continue
             else:
-                print(f"{indent}Level {level}: WARNING - No buffer available for {len(sinks)} sinks")
-
-            return tree_node
+                buffer_name = f"virtual_buf_L{level}"
+                print(f"{indent}Level {level}: WARNING - No buffer, using virtual node")
 
-        # Recursive case: partition and recurse
-        cx, cy = self.compute_centroid(sinks)
-        buffer = self.find_nearest_resource(cx, cy)
-
-        tree_node = {
-            'level': level,
-            'parent': parent_buffer,
-            'centroid': (cx, cy),
-            'buffer': None,
-            'children': []
-        }
-
-        if buffer:
-            buffer['claimed'] = True
-            buffer_name = buffer['name']
-            tree_node['buffer'] = buffer_name
-            tree_node['buffer_pos'] = (buffer['x'], buffer['y'])
-            tree_node['buffer_type'] = buffer['type']
-
-            print(f"{indent}Level {level}: Claimed {buffer['type']} '{buffer_name}' "
-                  f"at ({buffer['x']:.2f}, {buffer['y']:.2f}) - partitioning {len(sinks)} sinks")
-        else:
-            buffer_name = f"virtual_buf_L{level}"
-            print(f"{indent}Level {level}: WARNING - No buffer, using virtual node")
+            if is_leaf:
+                continue
 
-        # Partition into quadrants
-        quadrants = self.partition_sinks(sinks, cx, cy)
+            # Partition into quadrants
+            quadrants = self.partition_sinks(idx, cx, cy)
 
-        print(f"{indent}  Quadrants: {[len(q) for q in quadrants]}")
+            print(f"{indent}  Quadrants: {[len(q) for q in quadrants]}")
 
-        # Recurse on each quadrant
-        for i, quad_sinks in enumerate(quadrants):
-            child_node = self.build_htree_recursive(quad_sinks, level + 1, buffer_name)
-            if child_node:
-                tree_node['children'].append(child_node)
+            for quad_idx in reversed(quadrants):
+                stack.append((quad_idx, level + 1, buffer_name, tree_node))
 
-        return tree_node
+        return root
 
     def build_clock_tree(self) -> Dict:
         """Build the H-Tree clock tree structure."""
@@ -394,7 +886,7 @@ class HTreeCTS:
         print(f"\nBuilding H-Tree for {len(self.sinks)} sinks with {len(self.resources)} resources...")
         print("=" * 70)
 
-        self.clock_tree = self.build_htree_recursive(self.sinks)
+        self.clock_tree = self.build_htree(np.arange(len(self.sinks)))
 
         print("=" * 70)
         print("Clock tree construction complete")
@@ -430,17 +922,43 @@ class HTreeCTS:
         # Update the net to only have the port connection
         old_net['connections'] = [(self.clock_net, 'PORT')]
 
-        # Remove clock edges from netlist_graph
-        edges_to_remove = []
-        for u, v, data in self.netlist_graph.edges(data=True):
-            if data.get('net_id') == self.clock_net_id:
-                edges_to_remove.append((u, v))
+        # Remove clock edges from netlist_graph. Every clock edge joins two
+        # instances on the clock net, so only their adjacency needs scanning
+        graph = self.netlist_graph
+        clock_insts = {inst for inst, _ in old_connections}
+        edges_to_remove = set()
+        for u in clock_insts:
+            if u not in graph:
+                continue
+            for v, data in graph[u].items():
+                if data.get('net_id') == self.clock_net_id and (v, u) not in edges_to_remove:
+                    edges_to_remove.add((u, v))
 
-        for u, v in edges_to_remove:
-            self.netlist_graph.remove_edge(u, v)
+        graph.remove_edges_from(edges_to_remove)
 
         print(f"Removed {len(old_connections) - 1} old clock connections")
 
+    def max_net_id(self) -> int:
+        """
+        Highest numeric net ID in logical_db (0 if none).
+
+        The nets dict is scanned once; afterwards the cached value is kept
+        current by update_logical_db_and_graph as it allocates new nets.
+        """
+        if self._max_net_id is None:
+            max_net_id = 0
+            for k in self.logical_db['nets']:
+                if not isinstance(k, int):
+                    try:
+                        k = int(k)
+                    except (ValueError, TypeError):
+                        # Skip non-numeric net IDs
+                        continue
+                if k > max_net_id:
+                    max_net_id = k
+            self._max_net_id = max_net_id
+        return self._max_net_id
+
     def update_logical_db_and_graph(self):
         """Update logical_db and netlist_graph with new clock tree."""
         if not self.clock_tree:
@@ -453,26 +971,26 @@ class HTreeCTS:
         self.remove_old_clock_connections()
 
         # Counter for creating new net IDs
-        # Extract numeric net IDs to find the maximum
-        if self.logical_db['nets']:
-            net_ids = []
-            for k in self.logical_db['nets'].keys():
-                if isinstance(k, int):
-                    net_ids.append(k)
-                else:
-                    try:
-                        net_ids.append(int(k))
-                    except (ValueError, TypeError):
-                        # Skip non-numeric net IDs
-                        continue
-            max_net_id = max(net_ids) if net_ids else 0
-        else:
-            max_net_id = 0
-        net_counter = max_net_id + 1
+        net_counter = self.max_net_id() + 1
 
         # Track all buffers to add
         buffers_to_add = []
         connections_to_add = []  # (buffer_name, pin_name, net_id)
+        net_drivers = {}  # net_id -> buffer driving it (output pin 'Y')
+
+        # Clock pin name per cell type, resolved from the first instance seen
+        # (after remove_old_clock_connections, like the per-instance check was)
+        cells = self.logical_db['cells']
+        clock_pin_cache = {}
+
+        def clock_pin_for(cell):
+            cell_type = cell.get('type')
+            clock_pin = clock_pin_cache.get(cell_type)
+            if clock_pin is None:
+                # Find the clock pin (typically 'C' or 'CLK')
+                clock_pin = 'C' if 'C' in cell.get('pins', {}) else 'CLK'
+                clock_pin_cache[cell_type] = clock_pin
+            return clock_pin
 
         def traverse_tree(node, parent_net_id):
             """Traverse clock tree and build connection list."""
@@ -506,6 +1024,7 @@ class HTreeCTS:
 
                 # Connect buffer output to output net
                 connections_to_add.append((buffer_name, 'Y', out_net_id))
+                net_drivers[out_net_id] = buffer_name
 
                 # Process children with the output net
                 for child in node.get('children', []):
@@ -514,11 +1033,9 @@ class HTreeCTS:
                 # Connect sinks if this is a leaf
                 if 'sink_logical_names' in node:
                     for sink_name in node['sink_logical_names']:
-                        if sink_name in self.logical_db['cells']:
-                            # Find the clock pin (typically 'C' or 'CLK')
-                            cell = self.logical_db['cells'][sink_name]
-                            clock_pin = 'C' if 'C' in cell.get('pins', {}) else 'CLK'
-                            connections_to_add.append((sink_name, clock_pin, out_net_id))
+                        cell = cells.get(sink_name)
+                        if cell is not None:
+                            connections_to_add.append((sink_name, clock_pin_for(cell), out_net_id))
             else:
                 # Virtual node - pass through parent net
                 for child in node.get('children', []):
@@ -527,10 +1044,9 @@ class HTreeCTS:
                 # Connect sinks directly if this is a leaf
                 if 'sink_logical_names' in node:
                     for sink_name in node['sink_logical_names']:
-                        if sink_name in self.logical_db['cells']:
-                            cell = self.logical_db['cells'][sink_name]
-                            clock_pin = 'C' if 'C' in cell.get('pins', {}) else 'CLK'
-                            connections_to_add.append((sink_name, clock_pin, parent_net_id))
+                        cell = cells.get(sink_name)
+                        if cell is not None:
+                            connections_to_add.append((sink_name, clock_pin_for(cell), parent_net_id))
 
         # Start traversal from root with clock net
         traverse_tree(self.clock_tree, self.clock_net_id)
@@ -573,23 +1089,40 @@ class HTreeCTS:
                 }
             self.logical_db['nets'][net_id]['connections'].extend(connections)
 
-        # Add edges to netlist_graph
-        edges_added = 0
+        # Add edges to netlist_graph: a star from each net's driving buffer
+        # (or its first connection when the driver is not a new buffer), so a
+        # fanout-F clock net adds F-1 edges instead of an F-clique
+        # Edges are gathered per (u, v) pair first, so each pair costs one
+        # has_edge probe and new edges go in with a single add_edges_from
+        graph = self.netlist_graph
+        pending = {}  # (u, v) -> edge attrs, in first-seen order
         for net_id, connections in net_connections.items():
             node_list = [n for (n, _) in connections]
             if len(node_list) <= 1:
                 continue
 
             net_name = self.logical_db['nets'][net_id]['name']
+            u = net_drivers.get(net_id, node_list[0])
 
-            for i in range(len(node_list)):
-                for j in range(i + 1, len(node_list)):
-                    u, v = node_list[i], node_list[j]
-                    if not self.netlist_graph.has_edge(u, v):
-                        self.netlist_graph.add_edge(u, v, nets=[net_name], net_id=net_id)
-                        edges_added += 1
-                    else:
-                        self.netlist_graph[u][v]['nets'].append(net_name)
+            for v in node_list:
+                if v == u:
+                    continue
+                attrs = pending.get((u, v)) or pending.get((v, u))
+                if attrs is None:
+                    pending[(u, v)] = {'nets': [net_name], 'net_id': net_id}
+                else:
+                    attrs['nets'].append(net_name)
+
+        new_edges = []
+        for (u, v), attrs in pending.items():
+            if graph.has_edge(u, v):
+                graph[u][v]['nets'].extend(attrs['nets'])
+            else:
+                new_edges.append((u, v, attrs))
+        graph.add_edges_from(new_edges)
+        edges_added = len(new_edges)
+
+        self._max_net_id = net_counter - 1
 
         print(f"Added {len(net_connections)} new nets")
         print(f"Added {edges_added} edges to netlist_graph")
@@ -597,28 +1130,55 @@ class HTreeCTS:
               f"{len(self.netlist_graph.edges())} edges")
         return self.logical_db, self.netlist_graph
 
+    def _placement_rows(self):
+        """Yield (fabric_cell, store index, mapped instance) in map-file order."""
+        # Fabric cells claimed by CTS are mapped to themselves
+        claimed_names = {r['name'] for r in self.resources if r['claimed']}
+        store = self.fabric_cells
+        for fabric_cell in sorted(store.names):
+            i = store.name_to_idx[fabric_cell]
+            yield fabric_cell, i, fabric_cell if fabric_cell in claimed_names else store.mapped[i]
+
+    def placement_mapping(self) -> Dict[str, str]:
+        """
+        logical_instance -> fabric_cell for the updated placement, i.e. what
+        power_down.load_placement_mapping() reads back from write_placement()'s
+        file, without writing and re-parsing it.
+        """
+        return {mapped: fabric_cell for fabric_cell, _, mapped in self._placement_rows()}
+
+    def placement_maps(self) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """
+        (logical_to_fabric, fabric_to_logical) for the updated placement, as
+        make_def.load_placement_map() reads them back from write_placement()'s
+        file. UNUSED cells only appear in fabric_to_logical.
+        """
+        logical_to_fabric = {}
+        fabric_to_logical = {}
+        for fabric_cell, _, mapped in self._placement_rows():
+            fabric_to_logical[fabric_cell] = mapped
+            if mapped != "UNUSED":
+                logical_to_fabric[mapped] = fabric_cell
+        return logical_to_fabric, fabric_to_logical
+
     def write_placement(self, output_file: str):
         """Write updated placement.map with newly placed buffers."""
         print(f"\nWriting updated placement to: {output_file}")
 
-        with open(output_file, 'w') as f:
-            # Write I/O ports first
-            for port_name in sorted(self.io_ports.keys()):
-                x, y = self.io_ports[port_name]
-                f.write(f"{port_name} {x:.2f} {y:.2f}\n")
-
-            # Write fabric cells
-            for fabric_cell in sorted(self.fabric_cells.keys()):
-                info = self.fabric_cells[fabric_cell]
+        # Write I/O ports first
+        lines = []
+        for port_name in sorted(self.io_ports.keys()):
+            x, y = self.io_ports[port_name]
+            lines.append(f"{port_name} {x:.2f} {y:.2f}\n")
 
-                # Check if this cell was claimed by CTS
-                mapped = info['mapped']
-                for resource in self.resources:
-                    if resource['name'] == fabric_cell and resource['claimed']:
-                        mapped = fabric_cell  # Use the fabric cell name itself
-                        break
+        # Write fabric cells
+        store = self.fabric_cells
+        xs, ys = store.x.tolist(), store.y.tolist()
+        for fabric_cell, i, mapped in self._placement_rows():
+            lines.append(f"{fabric_cell}  {store.type[i]}  {xs[i]:.2f}  {ys[i]:.2f}  ->  {mapped}\n")
 
-                f.write(f"{fabric_cell}  {info['type']}  {info['x']:.2f}  {info['y']:.2f}  ->  {mapped}\n")
+        with open(output_file, 'w') as f:
+            f.write(''.join(lines))
 
         print(f"Wrote placement map")
 
@@ -626,23 +1186,19 @@ class HTreeCTS:
         """Write clock tree structure to JSON."""
         print(f"Writing clock tree structure to: {output_file}")
 
-        with open(output_file, 'w') as f:
-            json.dump(self.clock_tree, f, indent=2)
+        write_json(self.clock_tree, output_file)
 
     def write_logical_db(self, output_file: str = "logical_db_cts.json"):
         """Write updated logical_db to JSON."""
         print(f"Writing updated logical_db to: {output_file}")
 
-        with open(output_file, 'w') as f:
-            json.dump(self.logical_db, f, indent=2)
+        write_json(self.logical_db, output_file)
 
     def write_netlist_graph(self, output_file: str = "netlist_graph_cts.json"):
         """Write updated netlist_graph to JSON."""
         print(f"Writing updated netlist_graph to: {output_file}")
 
-        graph_data = json_graph.node_link_data(self.netlist_graph)
-        with open(output_file, 'w') as f:
-            json.dump(graph_data, f, indent=2)
+        write_node_link_json(self.netlist_graph, output_file)
 
     def print_summary(self):
         """Print summary statistics."""
@@ -652,18 +1208,21 @@ class HTreeCTS:
         print(f"Total DFF sinks:          {len(self.sinks)}")
         print(f"Total resources:          {len(self.resources)}")
 
-        claimed = sum(1 for r in self.resources if r['claimed'])
+        claimed = int(self._res_claimed.sum())
         print(f"Buffers claimed:          {claimed}")
         print(f"Buffers remaining:        {len(self.resources) - claimed}")
 
         if self.clock_tree:
-            def count_levels(node, max_level=0):
-                if not node:
-                    return max_level
-                current = node.get('level', 0)
-                max_level = max(max_level, current)
-                for child in node.get('children', []):
-                    max_level = max(max_level, count_levels(child, max_level))
+            def count_levels(root):
+                # One pass over the tree with an explicit stack
+                max_level = 0
+                stack = [root]
+                while stack:
+                    node = stack.pop()
+                    if not node:
+                        continue
+                    max_level = max(max_level, node.get('level', 0))
+                    stack.extend(node.get('children', ()))
                 return max_level
 
             max_depth = count_levels(self.clock_tree)
@@ -0,0 +1,95 @@
+"""
+db_cache.py
+-----------
+On-disk pickle cache for parsed databases (fabric_db, logical_db, ...).
+
+Each cache file stores a signature of its input files (path, mtime, size)
+plus the caller's cache format version next to the pickled object. A
+cache hit requires the signature to match exactly, so editing any input,
+or bumping the version after a parser change, transparently forces a
+rebuild. Cache files live under build/ (see cache_file), never next to
+the inputs.
+
+advise_sequential() is shared by the uncached readers of those inputs.
+
+Usage (import example):
+    from db_cache import input_signature, load_cached, store_cached
+    sig = input_signature("fabric/fabric.yaml", version=1)
+    path = cache_file("fabric_db", "fabric/fabric.yaml")
+    db = load_cached(path, sig)
+    if db is None:
+        db = expensive_build()
+        store_cached(path, sig, db)
+"""
+
+import hashlib
+import os
+import pickle
+from typing import Any, Optional, Tuple
+
+# Default directory for cache files (relative to the flow's working directory)
+CACHE_DIR = os.path.join("build", ".cache")
+
+
+def input_signature(*paths: str, version: int = 0) -> Optional[Tuple]:
+    """
+    Return (version, then a (path, mtime_ns, size) tuple per input), or None
+    if any input is missing. version is the caller's cache format version.
+    """
+    signature = [version]
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        signature.append((os.path.abspath(path), st.st_mtime_ns, st.st_size))
+    return tuple(signature)
+
+
+def cache_file(stem: str, *paths: str, cache_dir: str = CACHE_DIR) -> str:
+    """Cache file path for stem under cache_dir, distinct per set of input paths."""
+    key = "\0".join(os.path.abspath(p) for p in paths)
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{stem}_{digest}.pkl")
+
+
+def load_cached(cache_path: str, signature: Optional[Tuple]) -> Any:
+    """Return the cached object if cache_path exists and matches signature, else None."""
+    if signature is None or not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path, "rb") as f:
+            cached_signature, obj = pickle.load(f)
+    except Exception:
+        # Stale format, truncated write, etc. -- just rebuild
+        return None
+    if cached_signature != signature:
+        return None
+    return obj
+
+
+def store_cached(cache_path: str, signature: Optional[Tuple], obj: Any) -> bool:
+    """Pickle obj with its input signature. Returns False if the cache could not be written."""
+    if signature is None:
+        return False
+    tmp_path = cache_path + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            pickle.dump((signature, obj), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Warning: could not write cache {cache_path}: {e}")
+        return False
+    return True
+
+
+def advise_sequential(f) -> None:
+    """Hint that the open file f will be read once, start to end (no-op where unsupported)."""
+    fadvise = getattr(os, "posix_fadvise", None)
+    if fadvise is None:
+        return
+    try:
+        fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    except OSError:
+        pass
@@ -8,6 +8,11 @@ Generates final Verilog netlist with both clock tree and power-down modification
 Usage:
     python eco_generator.py --design 6502 [--placement placement_sa_optimized.map]
 
+    The flow also runs under PyPy (pypy3 eco_generator.py --design 6502), which
+    skips the matplotlib step; render the CTS plot afterwards with CPython via
+    python visualize.py --design 6502 --only cts_tree. Use --no-plot to skip it
+    under CPython too.
+
 Outputs:
     - build/[design]/[design]_final.v     (Final Verilog netlist)
     - build/[design]/[design]_cts_tree.png (CTS visualization)
@@ -15,72 +20,162 @@ Outputs:
 """
 
 import argparse
+import io
+import mmap
 import os
 import sys
 import json
-import copy
-import re
-from typing import Dict, Any, Tuple, Set
+import platform
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Dict, Any, Tuple, Set, FrozenSet, Optional, TextIO
 
 # Import local modules
 from cts_htree import HTreeCTS, parse_placement_map
-from power_down import run_power_down_eco, load_placement_mapping
+from power_down import run_power_down_eco
 from parse_lib import parse_liberty_leakage
-from visualization.cts_overlay import plot_cts_tree_overlay_from_tree
 from build_fabric_db import build_fabric_db
 from parse_design import parse_design_json
-import subprocess
+from db_cache import input_signature, cache_file, load_cached, store_cached
+from tools.rename_verilog_cells import rename_verilog
+
+# Verilog line templates for the per-cell / per-pin loop
+VERILOG_CELL_FMT = "  %s %s (%s);\n"
+VERILOG_CONN_FMT = ".%s(%s)"
+
+# Fallback names to try when a netlist pin is not in the LEF definition
+PIN_FALLBACKS = {
+    'Y': ['X', 'Y', 'Q'],  # Try X for output pins
+    'A': ['A', 'I', 'IN'],
+    'B': ['B', 'IN2'],
+}
+
+# Technology files read by the ECO flow
+LIBERTY_FILE = "tech/sky130_fd_sc_hd__tt_025C_1v80.lib"
+LEF_FILES = ['tech/sky130_fd_sc_hd.lef', 'tech/fabric_cells.lef']
+
+# Part of the LEF pin cache signature; bump whenever _read_lef_pins' output
+# changes so caches written by older code are rebuilt
+LEF_PINS_CACHE_VERSION = 2
 
 
-def parse_lef_for_pins(lef_file: str) -> Dict[str, Set[str]]:
+def _read_lef_pins(lef_file: str) -> Dict[str, FrozenSet[str]]:
+    """Scan a LEF file for MACRO/PIN names (raises IOError if unreadable)."""
+    cell_pins = {}
+
+    # Single pass over the lines, tracking the open MACRO and PIN by name. A
+    # PIN counts once its "END <pin>" is seen, and a MACRO is recorded at
+    # its "END <macro>" if it has any pins. Keywords and the names after END
+    # are matched case-insensitively (as the old IGNORECASE regex did); the
+    # names are kept as spelled at MACRO/PIN. The file is mapped and scanned
+    # as bytes; only kept names are decoded
+    current_macro = current_macro_key = None
+    current_pin = current_pin_key = None
+    pins = set()
+
+    with open(lef_file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return cell_pins
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line in iter(mm.readline, b''):
+                tokens = line.split()
+                if len(tokens) < 2:
+                    continue
+                keyword = tokens[0].upper()
+
+                if keyword == b'MACRO':
+                    current_macro, current_macro_key = tokens[1], tokens[1].upper()
+                    current_pin, pins = None, set()
+                elif current_macro is None:
+                    continue
+                elif keyword == b'PIN':
+                    current_pin, current_pin_key = tokens[1], tokens[1].upper()
+                elif keyword == b'END':
+                    name = tokens[1].upper()
+                    if current_pin is not None and name == current_pin_key:
+                        pins.add(current_pin.decode())
+                        current_pin = None
+                    elif name == current_macro_key:
+                        if pins:
+                            cell_pins[current_macro.decode()] = frozenset(pins)
+                        current_macro, current_pin, pins = None, None, set()
+
+    return cell_pins
+
+
+def _lef_signature(lef_file: str) -> Optional[Tuple]:
+    """Cache key for a LEF: its path, mtime and size plus LEF_PINS_CACHE_VERSION."""
+    return input_signature(lef_file, version=LEF_PINS_CACHE_VERSION)
+
+
+@lru_cache(maxsize=8)
+def _cached_lef_pins(lef_file: str, signature: Tuple,
+                     cache_dir: Optional[str] = None) -> Dict[str, FrozenSet[str]]:
+    """
+    LEF pins for one (file, signature) pair: memoized in-process and, with a
+    cache_dir (build/<design>/.lef_cache in the flow), pickled there so
+    other runs skip the scan too.
+    """
+    cache_path = cache_file("lef_pins", lef_file, cache_dir=cache_dir) if cache_dir else None
+    cell_pins = load_cached(cache_path, signature) if cache_path else None
+    if cell_pins is None:
+        cell_pins = _read_lef_pins(lef_file)
+        if cache_path:
+            store_cached(cache_path, signature, cell_pins)
+    return cell_pins
+
+
+def parse_lef_for_pins(lef_file: str, use_cache: bool = True,
+                       cache_dir: Optional[str] = None) -> Dict[str, FrozenSet[str]]:
     """
     Parse LEF file to extract pin names for each cell type.
-    
+
+    Results are memoized per file, keyed on its path, mtime, size and
+    LEF_PINS_CACHE_VERSION, so repeated calls do not rescan an unchanged
+    LEF; with cache_dir they are also pickled there for later runs.
+
     Args:
         lef_file: Path to LEF file
-        
+        use_cache: reuse/store the cached result
+        cache_dir: directory for the on-disk cache (None: in-process only)
+
     Returns:
-        Dict mapping cell type names to sets of pin names
+        Dict mapping cell type names to (frozen) sets of pin names
         Example: {'sky130_fd_sc_hd__clkbuf_4': {'A', 'X', 'VDD', 'VSS'}}
     """
-    cell_pins = {}
-    
     if not os.path.exists(lef_file):
         print(f"[WARN] LEF file not found: {lef_file}")
-        return cell_pins
-    
+        return {}
+
     try:
-        with open(lef_file, 'r') as f:
-            content = f.read()
+        if use_cache:
+            cell_pins = _cached_lef_pins(lef_file, _lef_signature(lef_file), cache_dir)
+        else:
+            cell_pins = _read_lef_pins(lef_file)
     except IOError as e:
         print(f"[WARN] Cannot read LEF file: {e}")
-        return cell_pins
-    
-    # Extract MACRO definitions and their PINs
-    macro_pattern = r'MACRO\s+(\S+)\s*\n(.*?)END\s+\1'
-    
-    for macro_match in re.finditer(macro_pattern, content, re.DOTALL | re.IGNORECASE):
-        macro_name = macro_match.group(1)
-        macro_body = macro_match.group(2)
-        
-        # Find all PIN statements within this MACRO
-        pin_pattern = r'PIN\s+(\S+)\s*\n(.*?)END\s+\1'
-        pins = set()
-        
-        for pin_match in re.finditer(pin_pattern, macro_body, re.DOTALL | re.IGNORECASE):
-            pin_name = pin_match.group(1)
-            pins.add(pin_name)
-        
-        if pins:
-            cell_pins[macro_name] = pins
-    
+        return {}
+
     if cell_pins:
         print(f"[INFO] Extracted pin definitions for {len(cell_pins)} cell types from LEF")
-    
-    return cell_pins
 
+    # Fresh dict per call; the pin sets themselves are immutable
+    return dict(cell_pins)
 
-def generate_verilog_from_logical_db(logical_db: Dict[str, Any], design_name: str, cell_pins: Dict[str, Set[str]] = None) -> str:
+
+def _resolve_pin_name(pin_name: str, upper_map: Dict[str, str]) -> Optional[str]:
+    """LEF name for a netlist pin (case-insensitive, then PIN_FALLBACKS), or None."""
+    valid_pin_name = upper_map.get(pin_name.upper())
+    if valid_pin_name is None:
+        for mapped_pin in PIN_FALLBACKS.get(pin_name, ()):
+            if mapped_pin.upper() in upper_map:
+                return mapped_pin
+    return valid_pin_name
+
+
+def generate_verilog_from_logical_db(logical_db: Dict[str, Any], design_name: str,
+                                     cell_pins: Dict[str, Set[str]] = None, out: TextIO = None) -> Optional[str]:
     """
     Generate a minimal Verilog netlist from logical_db.
 
@@ -90,11 +185,14 @@ def generate_verilog_from_logical_db(logical_db: Dict[str, Any], design_name: st
     Args:
         logical_db: Updated logical database with CTS/ECO modifications
         design_name: Design name for module/prefix
+        cell_pins: LEF pin names per cell type (see parse_lef_for_pins)
+        out: Writable text file to stream the netlist into
 
     Returns:
-        String containing Verilog netlist
+        String containing Verilog netlist, or None when written to `out`
     """
-    lines = []
+    buf = io.StringIO() if out is None else out
+    write = buf.write
 
     # Module header
     ports = logical_db.get("ports", {})
@@ -103,81 +201,90 @@ def generate_verilog_from_logical_db(logical_db: Dict[str, Any], design_name: st
 
     all_ports = input_ports + output_ports
     port_str = ", ".join(all_ports)
-    lines.append(f"module {design_name} ({port_str});")
-    lines.append("")
+    write(f"module {design_name} ({port_str});\n\n")
 
     # Port declarations
     if input_ports:
-        lines.append(f"  input {', '.join(input_ports)};")
+        write(f"  input {', '.join(input_ports)};\n")
     if output_ports:
-        lines.append(f"  output {', '.join(output_ports)};")
-    lines.append("")
+        write(f"  output {', '.join(output_ports)};\n")
+    write("\n")
 
     # Internal wire declarations (from nets)
     nets = logical_db.get("nets", {})
-    internal_nets = []
-    for net_id, net_info in nets.items():
-        net_name = net_info.get("name", f"net_{net_id}")
-        if net_name not in all_ports:
-            internal_nets.append(net_name)
+    # Net ID -> name, resolved once for the wire list and every pin below.
+    # The net_<id> fallback is only formatted for nets without a name
+    net_names = {net_id: net_info["name"] if "name" in net_info else f"net_{net_id}"
+                 for net_id, net_info in nets.items()}
+    port_set = set(all_ports)
+    internal_nets = [name for name in net_names.values() if name not in port_set]
 
     if internal_nets:
-        lines.append(f"  wire {', '.join(internal_nets)};")
-        lines.append("")
+        write(f"  wire {', '.join(internal_nets)};\n\n")
 
     # Cell instantiations
     if cell_pins is None:
         cell_pins = {}
-    
+    # Case-insensitive pin lookup per cell type: UPPER_PIN -> LEF pin name
+    cell_pins_upper = {ct: {p.upper(): p for p in pins} for ct, pins in cell_pins.items()}
+    # Resolved LEF pin name (or None) per cell type and netlist pin; every
+    # instance of a type shares the same answers, so each is worked out once
+    resolved_pins: Dict[str, Dict[str, Optional[str]]] = {}
+    # Unresolved (cell_type, pin) occurrences, reported once after the loop
+    warn_counts = Counter()
+
     cells = logical_db.get("cells", {})
-    for cell_name, cell_info in sorted(cells.items()):
+    # Sort the names only (not (name, info) tuples) for a stable output order
+    for cell_name in sorted(cells):
+        cell_info = cells[cell_name]
         cell_type = cell_info.get("type", "")
         pins = cell_info.get("pins", {})
 
         # Get valid pins for this cell type from LEF
         valid_pins = cell_pins.get(cell_type, set())
+        resolved = resolved_pins.get(cell_type)
+        if resolved is None:
+            resolved = resolved_pins[cell_type] = {}
 
         # Build port connections - only include pins that exist in the cell definition
         connections = []
         for pin_name, net_id in pins.items():
-            # Skip pins not in LEF definition (use case-insensitive matching)
-            valid_pin_name = None
-            for vpin in valid_pins:
-                if pin_name.upper() == vpin.upper():
-                    valid_pin_name = vpin
-                    break
-            
+            # Skip pins not in LEF definition (case-insensitive, then common mappings)
+            if pin_name in resolved:
+                valid_pin_name = resolved[pin_name]
+            else:
+                valid_pin_name = resolved[pin_name] = _resolve_pin_name(
+                    pin_name, cell_pins_upper.get(cell_type, {}))
+
             if valid_pin_name is None:
-                # Pin not found in LEF - try common mappings
-                pin_mapping = {
-                    'Y': ['X', 'Y', 'Q'],  # Try X for output pins
-                    'A': ['A', 'I', 'IN'],
-                    'B': ['B', 'IN2'],
-                }
-                for mapped_pin in pin_mapping.get(pin_name, []):
-                    if mapped_pin.upper() in {p.upper() for p in valid_pins}:
-                        valid_pin_name = mapped_pin
-                        break
-                
-                if valid_pin_name is None:
-                    # Still not found - warn and skip
-                    if valid_pins:
-                        print(f"[WARN] Pin '{pin_name}' not found in LEF for cell type '{cell_type}' (available: {', '.join(sorted(valid_pins))})")
-                    continue
-            
-            net_info = nets.get(net_id, {})
-            net_name = net_info.get("name", f"net_{net_id}")
-            connections.append(f".{valid_pin_name}({net_name})")
+                # Still not found - skip (and warn below)
+                if valid_pins:
+                    warn_counts[(cell_type, pin_name)] += 1
+                continue
+
+            net_name = net_names.get(net_id)
+            if net_name is None:
+                net_name = f"net_{net_id}"
+            connections.append(VERILOG_CONN_FMT % (valid_pin_name, net_name))
 
         if connections:
-            conn_str = ", ".join(connections)
-            lines.append(f"  {cell_type} {cell_name} ({conn_str});")
+            write(VERILOG_CELL_FMT % (cell_type, cell_name, ", ".join(connections)))
+
+    write("\nendmodule\n")
 
-    lines.append("")
-    lines.append("endmodule")
-    lines.append("")
+    if warn_counts:
+        print(f"[WARN] {sum(warn_counts.values())} pins not found in LEF across "
+              f"{len(warn_counts)} (cell type, pin) pairs:")
+        # LEF pin list per reported cell type, sorted once
+        available = {}
+        for (cell_type, pin_name), count in warn_counts.most_common(10):
+            if cell_type not in available:
+                available[cell_type] = ', '.join(sorted(cell_pins[cell_type]))
+            print(f"    {cell_type}.{pin_name}: {count} (available: {available[cell_type]})")
+        if len(warn_counts) > 10:
+            print(f"    ... and {len(warn_counts) - 10} more")
 
-    return "\n".join(lines)
+    return buf.getvalue() if out is None else None
 
 
 def run_eco_generator(
@@ -189,7 +296,8 @@ def run_eco_generator(
         placement_file: str,
         output_dir: str,
         design_name: str,
-        verbose: bool = True
+        verbose: bool = True,
+        plot: bool = True
 ) -> Tuple[str, str]:
     """
     Run full ECO flow: CTS + Power-Down ECO + Verilog generation.
@@ -204,9 +312,11 @@ def run_eco_generator(
         output_dir: Output directory
         design_name: Design name (e.g., '6502')
         verbose: Print progress messages
+        plot: Render the CTS overlay PNG (needs matplotlib)
 
     Returns:
-        Tuple of (final_verilog, eco_report)
+        Tuple of (final_verilog, eco_report); final_verilog is the text of
+        <design>_final.v as written (after renaming), or None on failure
     """
     if verbose:
         print("=" * 70)
@@ -217,6 +327,17 @@ def run_eco_generator(
         print(f"Output directory: {output_dir}")
         print()
 
+    # Liberty and LEF parsing only depend on the tech files, so start them in
+    # the background and let them overlap with CTS. The LEF jobs just warm the
+    # pin cache; Step 3.5 still calls parse_lef_for_pins so its messages print
+    # in order
+    lef_cache_dir = os.path.join(output_dir, ".lef_cache")
+    executor = ThreadPoolExecutor(max_workers=1 + len(LEF_FILES))
+    leakage_future = executor.submit(parse_liberty_leakage, LIBERTY_FILE, verbose=False)
+    lef_futures = [executor.submit(_cached_lef_pins, lef_file, _lef_signature(lef_file), lef_cache_dir)
+                   for lef_file in LEF_FILES if os.path.exists(lef_file)]
+    executor.shutdown(wait=False)
+
     # ========================================
     # Step 1: Run CTS
     # ========================================
@@ -246,9 +367,10 @@ def run_eco_generator(
         if verbose:
             cts.print_summary()
 
-        # Keep the updated logical_db and netlist_graph from CTS
+        # Keep the updated logical_db, netlist_graph and placement from CTS
         logical_db_cts = cts.logical_db
         netlist_graph_cts = cts.netlist_graph
+        placement_map = cts.placement_mapping()
 
         if verbose:
             print()
@@ -269,14 +391,10 @@ def run_eco_generator(
         print("=" * 70)
 
     try:
-        # Parse Liberty file for leakage data
-        liberty_file = "tech/sky130_fd_sc_hd__tt_025C_1v80.lib"
+        # Leakage data from the Liberty file (parsed in the background)
         if verbose:
-            print(f"Loading leakage data from: {liberty_file}")
-        leakage_db = parse_liberty_leakage(liberty_file, verbose=False)
-        
-        # Load placement mapping for ECO
-        placement_map = load_placement_mapping(cts_placement_file)
+            print(f"Loading leakage data from: {LIBERTY_FILE}")
+        leakage_db = leakage_future.result()
 
         # Run ECO with per-input tie selection
         updated_logical_db, eco_report = run_power_down_eco(
@@ -306,8 +424,9 @@ def run_eco_generator(
         print("STEP 3: Merging CTS and ECO modifications")
         print("=" * 70)
 
-    # The updated_logical_db from ECO already includes CTS buffers
-    merged_logical_db = copy.deepcopy(updated_logical_db)
+    # The updated_logical_db from ECO already includes CTS buffers. Nothing
+    # below mutates it, so it is used as-is rather than deep-copied
+    merged_logical_db = updated_logical_db
 
     if verbose:
         print(f"  Merged logical_db has {len(merged_logical_db['cells'])} cells")
@@ -322,12 +441,14 @@ def run_eco_generator(
         print("STEP 3.5: Parsing LEF file for pin definitions")
         print("=" * 70)
 
+    # Errors are left to parse_lef_for_pins, which warns and skips the file
+    wait(lef_futures)
     cell_pins = {}
-    for lef_file in ['tech/sky130_fd_sc_hd.lef', 'tech/fabric_cells.lef']:
+    for lef_file in LEF_FILES:
         if os.path.exists(lef_file):
             if verbose:
                 print(f"  Reading: {lef_file}")
-            lef_pins = parse_lef_for_pins(lef_file)
+            lef_pins = parse_lef_for_pins(lef_file, cache_dir=lef_cache_dir)
             cell_pins.update(lef_pins)
             if verbose:
                 print(f"    Found pins for {len(lef_pins)} cell types")
@@ -345,44 +466,40 @@ def run_eco_generator(
         print("=" * 70)
 
     try:
-        final_verilog = generate_verilog_from_logical_db(merged_logical_db, design_name, cell_pins)
-
+        # Stream the netlist straight into the file rather than building it
+        # as one string first
         verilog_file = os.path.join(output_dir, f"{design_name}_final.v")
         with open(verilog_file, 'w') as f:
-            f.write(final_verilog)
+            generate_verilog_from_logical_db(merged_logical_db, design_name, cell_pins, out=f)
 
         if verbose:
             print(f"  Written: {verilog_file}")
-            print(f"  Lines: {len(final_verilog.split(chr(10)))}")
             print()
 
         # Run renamer to ensure final netlist uses fabric placement names
+        final_verilog = None
         try:
             if verbose:
                 print("  Running renamer to apply fabric names to final netlist...")
-            cmd = [
-                sys.executable, "tools/rename_verilog_cells.py",
-                "--verilog", verilog_file,
-                "--placement", cts_placement_file,
-                "--output", verilog_file
-            ]
-            # Run the script; allow it to overwrite the file
-            proc = subprocess.run(cmd, capture_output=not verbose, text=True)
-            if proc.returncode != 0:
-                print("Warning: renamer script exited with non-zero status")
-                if not verbose:
-                    print(proc.stdout)
-                    print(proc.stderr)
-            else:
-                if verbose:
-                    print("  Renamer completed; final netlist updated with fabric names.")
+            # Run in-process (no interpreter spawn); it overwrites the file and
+            # returns the text it wrote, so the file is not read back
+            final_verilog, rename_stats = rename_verilog(verilog_file, cts_placement_file, verilog_file)
+            if verbose:
+                print(f"  Renamer completed; {rename_stats['renamed_cells']} cells renamed, "
+                      f"final netlist updated with fabric names.")
 
-            # Read back renamed netlist into memory
+        except Exception as e:
+            print(f"Warning: failed to run renamer: {e}")
+
+        if final_verilog is None:
+            # Renamer failed; the file on disk still holds the generated netlist
             with open(verilog_file, 'r') as f:
                 final_verilog = f.read()
 
-        except Exception as e:
-            print(f"Warning: failed to run renamer: {e}")
+        if verbose:
+            num_lines = final_verilog.count('\n') + 1
+            print(f"  Lines: {num_lines}")
+            print()
 
     except Exception as e:
         print(f"Error generating Verilog: {e}")
@@ -394,30 +511,38 @@ def run_eco_generator(
     # ========================================
     # Step 5: Generate CTS visualization
     # ========================================
-    if verbose:
-        print("=" * 70)
-        print("STEP 5: Generating CTS visualization")
-        print("=" * 70)
+    cts_png = os.path.join(output_dir, f"{design_name}_cts_tree.png")
+    if plot:
+        if verbose:
+            print("=" * 70)
+            print("STEP 5: Generating CTS visualization")
+            print("=" * 70)
 
-    try:
-        cts_png = os.path.join(output_dir, f"{design_name}_cts_tree.png")
-        # Use full-fabric CTS overlay that renders every buffer/FF directly from the tree
-        with open(clock_tree_file, 'r') as f:
-            clock_tree_json = json.load(f)
-        plot_cts_tree_overlay_from_tree(
-            clock_tree_json,
-            fabric_db,
-            out_png=cts_png
-        )
+        try:
+            # Imported here so the rest of the flow does not need matplotlib
+            from visualization.cts_overlay import plot_cts_tree_overlay_from_tree
+
+            # Use full-fabric CTS overlay that renders every buffer/FF directly from the tree
+            with open(clock_tree_file, 'r') as f:
+                clock_tree_json = json.load(f)
+            plot_cts_tree_overlay_from_tree(
+                clock_tree_json,
+                fabric_db,
+                out_png=cts_png
+            )
 
-        if verbose:
-            print()
+            if verbose:
+                print()
 
-    except Exception as e:
-        print(f"Error generating CTS visualization: {e}")
-        if verbose:
-            import traceback
-            traceback.print_exc()
+        except Exception as e:
+            print(f"Error generating CTS visualization: {e}")
+            if verbose:
+                import traceback
+                traceback.print_exc()
+    elif verbose:
+        print(f"Skipping CTS visualization (render later with: "
+              f"python visualize.py --design {design_name} --only cts_tree)")
+        print()
 
     # ========================================
     # Step 6: Write summary
@@ -429,7 +554,8 @@ def run_eco_generator(
         print()
         print("Outputs:")
         print(f"  - {verilog_file}")
-        print(f"  - {cts_png}")
+        if plot:
+            print(f"  - {cts_png}")
         print(f"  - {os.path.join(output_dir, 'eco_report.txt')}")
         print()
 
@@ -448,6 +574,8 @@ def main():
     parser.add_argument("--design", required=True, help="Design name (e.g., 6502)")
     parser.add_argument("--placement", default=None, help="Path to placement.map file")
     parser.add_argument("--output", default=None, help="Output directory (default: build/[design]/)")
+    parser.add_argument("--no-plot", action="store_true",
+                        help="Skip the CTS visualization (always skipped under PyPy)")
     args = parser.parse_args()
 
     design_name = args.design
@@ -530,7 +658,9 @@ def main():
         placement_file=placement_file,
         output_dir=output_dir,
         design_name=design_name,
-        verbose=True
+        verbose=True,
+        # matplotlib is not generally available for PyPy
+        plot=not args.no_plot and platform.python_implementation() != "PyPy"
     )
 
     if final_verilog is None:
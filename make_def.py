@@ -27,20 +27,35 @@ Example:
 
 import sys
 import os
-import yaml
 import json
 import re
 from typing import Dict, List, Tuple, Any, Optional
 from collections import defaultdict
+from operator import itemgetter
 import string
 
+import numpy as np
+
 # Import required modules
 from build_fabric_db import build_fabric_db
 from parse_design import parse_design_json
 from cts_htree import HTreeCTS, parse_placement_map
-from power_down import run_power_down_eco, load_placement_mapping
+from power_down import run_power_down_eco, load_placement_mapping, read_placement_records
 from parse_lib import parse_liberty_leakage
 
+# Per-record DEF templates for write_def_file's hot loops
+DEF_COMP_FMT = "  - %s %s + %s ( %s %s ) %s ;\n"
+DEF_COMP_UNPLACED_FMT = "  - %s %s + UNPLACED ;\n"
+DEF_PIN_FMT = ("  - %s + NET %s\n"
+               "    + DIRECTION %s\n"
+               "    + USE %s\n"
+               "    + PORT\n"
+               "      + LAYER %s\n"
+               "        ( %s %s ) ( %s %s )\n"
+               "      + PLACED ( %s %s ) %s ;\n")
+DEF_NET_PIN_FMT = "      ( PIN %s )\n"
+DEF_NET_CONN_FMT = "      ( %s %s )\n"
+
 
 def parse_lef_file(lef_file: str) -> Dict[str, Any]:
     """
@@ -559,29 +574,16 @@ def load_placement_map(placement_file: str) -> Tuple[Dict[str, str], Dict[str, s
         print(f"[ERROR] Placement file not found: {placement_file}")
         return logical_to_fabric, fabric_to_logical
 
-    with open(placement_file, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line or '->' not in line:
-                continue
-
-            # Split on '->'
-            parts = line.split('->')
-            if len(parts) != 2:
-                continue
-
-            left_part = parts[0].strip().split()
-            logical_inst = parts[1].strip()
-
-            if len(left_part) >= 1:
-                fabric_cell = left_part[0]
+    # Shares one parse with load_placement_mapping and main's placement_data
+    for left_part, logical_inst in read_placement_records(placement_file):
+        fabric_cell = left_part[0]
 
-                # Always map fabric to logical (even if UNUSED)
-                fabric_to_logical[fabric_cell] = logical_inst
+        # Always map fabric to logical (even if UNUSED)
+        fabric_to_logical[fabric_cell] = logical_inst
 
-                # Only map logical to fabric if not UNUSED
-                if logical_inst != "UNUSED":
-                    logical_to_fabric[logical_inst] = fabric_cell
+        # Only map logical to fabric if not UNUSED
+        if logical_inst != "UNUSED":
+            logical_to_fabric[logical_inst] = fabric_cell
 
     return logical_to_fabric, fabric_to_logical
 
@@ -889,18 +891,19 @@ def generate_rows_from_fabric_layout(fabric_db: Dict[str, Any],
         return []
 
 
-def snap_to_grid(x: int, y: int, x_grid: int = 460, y_grid: int = 2720) -> Tuple[int, int]:
+def snap_to_grid(x, y, x_grid: int = 460, y_grid: int = 2720) -> Tuple[Any, Any]:
     """
     Snap coordinates to placement grid.
     
-    Rounds coordinates to nearest valid grid point based on site dimensions.
+    Floors coordinates to the grid point below based on site dimensions.
+    Works on plain ints and element-wise on NumPy integer arrays.
     For structured ASIC:
     - X coordinates must be multiples of site width in DBU
     - Y coordinates must be multiples of site height in DBU
     
     Args:
-        x: X coordinate in database units
-        y: Y coordinate in database units
+        x: X coordinate(s) in database units (int or int array)
+        y: Y coordinate(s) in database units (int or int array)
         x_grid: X grid spacing in DBU (site width, default 460 for Sky130 unithd)
         y_grid: Y grid spacing in DBU (site height, default 2720 for Sky130 unithd)
     
@@ -975,9 +978,11 @@ def extract_components(fabric_db: Dict[str, Any],
     components = []
 
     # Get all fabric cells from cells_by_tile
-    cells_by_tile = fabric_db.get('fabric', {}).get('cells_by_tile', {})
-    units = fabric_db.get('fabric', {}).get('pin_placement', {}).get('units', {}).get('dbu_per_micron', 1000)
-    coords_raw = fabric_db.get('fabric', {}).get('pin_placement', {}).get('units', {}).get('coords', 'micron').upper()
+    fabric_info = fabric_db.get('fabric', {})
+    cells_by_tile = fabric_info.get('cells_by_tile', {})
+    units_info = fabric_info.get('pin_placement', {}).get('units', {})
+    units = units_info.get('dbu_per_micron', 1000)
+    coords_raw = units_info.get('coords', 'micron').upper()
     
     # Ensure coords is in proper DEF format (MICRONS or NANOMETERS)
     if 'MICRON' in coords_raw:
@@ -989,91 +994,96 @@ def extract_components(fabric_db: Dict[str, Any],
 
     debug_components = os.environ.get("DEBUG_COMPONENTS", "").lower() in ("1", "true", "yes", "on")
 
-    # Map of all fabric cells for lookup
+    # Position/orientation of every named fabric cell, for T-cell lookup
     fabric_cell_map = {}
     for tile_name, tile_data in cells_by_tile.items():
         for cell in tile_data.get('cells', []):
-            fabric_cell_name = cell.get('name', '')
+            cell_get = cell.get
+            fabric_cell_name = cell_get('name', '')
             if fabric_cell_name:
-                fabric_cell_map[fabric_cell_name] = {
-                    'tile': tile_name,
-                    'type': cell.get('cell_type', ''),
-                    'x': cell.get('x', 0),
-                    'y': cell.get('y', 0),
-                    'orient': cell.get('orient', 'N'),
-                    'width_um': cell.get('width_um', 0),
-                    'height_um': cell.get('height_um', 0)
-                }
+                fabric_cell_map[fabric_cell_name] = (cell_get('x', 0), cell_get('y', 0), cell_get('orient', 'N'))
+
+    # First pass: pick each cell's coordinate source. Raw coordinates and
+    # their scale (units for micron sources, 1 for logical_db DBU values) are
+    # collected so the DBU conversion and grid snap run as array operations
+    names = []
+    models = []
+    orients = []
+    raw_x = []
+    raw_y = []
+    scales = []
 
     if logical_db and 'cells' in logical_db:
         for cell_name, cell_info in sorted(logical_db['cells'].items()):
-            cell_type = cell_info.get('type', 'UNKNOWN')
+            info_get = cell_info.get
+            cell_type = info_get('type', 'UNKNOWN')
 
-            placed_x = None
-            placed_y = None
-            placed_orient = cell_info.get('orient', cell_info.get('orientation', 'N'))
-            coord_src = None
+            x = 0
+            y = 0
+            scale = 1
+            placed_orient = info_get('orient', info_get('orientation', 'N'))
 
             # Flow: $ cells use placement_data, T cells use fabric_db, others use logical_db
             if cell_name.startswith('$'):
                 # $ cells: look up in placement_data
-                if placement_data and cell_name in placement_data:
-                    p_info = placement_data[cell_name]
-                    placed_x = int(p_info.get('x', 0) * units)
-                    placed_y = int(p_info.get('y', 0) * units)
+                p_info = placement_data.get(cell_name) if placement_data else None
+                if p_info is not None:
+                    x = p_info.get('x', 0)
+                    y = p_info.get('y', 0)
+                    scale = units
                     placed_orient = p_info.get('orient', placed_orient)
-                    coord_src = "placement_data"
-                    if debug_components:
-                        print(f"[DEBUG] $ cell {cell_name}: found in placement_data -> ({placed_x},{placed_y})")
-                else:
-                    placed_x = 0
-                    placed_y = 0
-                    coord_src = "origin_not_found"
                     if debug_components:
-                        print(f"[DEBUG] $ cell {cell_name}: NOT in placement_data -> (0,0)")
+                        print(f"[DEBUG] $ cell {cell_name}: found in placement_data -> ({int(x * units)},{int(y * units)})")
+                elif debug_components:
+                    print(f"[DEBUG] $ cell {cell_name}: NOT in placement_data -> (0,0)")
             elif cell_name.startswith('T'):
                 # T cells: use fabric_db by name
                 fab_info = fabric_cell_map.get(cell_name)
                 if fab_info:
-                    placed_x = int(fab_info.get('x', 0) * units)
-                    placed_y = int(fab_info.get('y', 0) * units)
-                    placed_orient = fab_info.get('orient', placed_orient)
-                    coord_src = "fabric_db"
+                    x, y, placed_orient = fab_info
+                    scale = units
                     if debug_components:
-                        print(f"[DEBUG] T cell {cell_name}: found in fabric_db -> ({placed_x},{placed_y})")
-                else:
-                    placed_x = 0
-                    placed_y = 0
-                    coord_src = "origin_not_found"
-                    if debug_components:
-                        print(f"[DEBUG] T cell {cell_name}: NOT in fabric_db -> (0,0)")
+                        print(f"[DEBUG] T cell {cell_name}: found in fabric_db -> ({int(x * units)},{int(y * units)})")
+                elif debug_components:
+                    print(f"[DEBUG] T cell {cell_name}: NOT in fabric_db -> (0,0)")
             else:
                 # Other cells: use logical_db placement if available
-                if cell_info.get('x') is not None and cell_info.get('y') is not None:
-                    placed_x = int(cell_info.get('x'))
-                    placed_y = int(cell_info.get('y'))
-                    coord_src = "logical_db"
+                cell_x = info_get('x')
+                cell_y = info_get('y')
+                if cell_x is not None and cell_y is not None:
+                    x = int(cell_x)
+                    y = int(cell_y)
                     if debug_components:
-                        print(f"[DEBUG] cell {cell_name}: found in logical_db -> ({placed_x},{placed_y})")
-                else:
-                    placed_x = 0
-                    placed_y = 0
-                    coord_src = "origin"
-                    if debug_components:
-                        print(f"[DEBUG] cell {cell_name}: no placement -> (0,0)")
-
-            placed_x, placed_y = snap_to_grid(placed_x, placed_y, x_grid, y_grid)
-
-            components.append({
-                'name': cell_name,
-                'model': cell_type,
-                'source': 'NETLIST',
-                'x': placed_x,
-                'y': placed_y,
-                'orient': placed_orient,
-                'status': 'FIXED',
-                'weight': 1.0
-            })
+                        print(f"[DEBUG] cell {cell_name}: found in logical_db -> ({x},{y})")
+                elif debug_components:
+                    print(f"[DEBUG] cell {cell_name}: no placement -> (0,0)")
+
+            names.append(cell_name)
+            models.append(cell_type)
+            orients.append(placed_orient)
+            raw_x.append(x)
+            raw_y.append(y)
+            scales.append(scale)
+
+    # Second pass: DBU conversion (truncating, as int() does) and grid snap
+    # for all cells at once
+    scale_arr = np.asarray(scales, dtype=np.float64)
+    xs = (np.asarray(raw_x, dtype=np.float64) * scale_arr).astype(np.int64)
+    ys = (np.asarray(raw_y, dtype=np.float64) * scale_arr).astype(np.int64)
+    xs, ys = snap_to_grid(xs, ys, x_grid, y_grid)
+
+    for cell_name, cell_type, placed_x, placed_y, placed_orient in zip(
+            names, models, xs.tolist(), ys.tolist(), orients):
+        components.append({
+            'name': cell_name,
+            'model': cell_type,
+            'source': 'NETLIST',
+            'x': placed_x,
+            'y': placed_y,
+            'orient': placed_orient,
+            'status': 'FIXED',
+            'weight': 1.0
+        })
 
     if not components:
         print(f"[WARN] No components extracted from fabric database or logical database")
@@ -1114,12 +1124,16 @@ def write_def_file(design_name: str,
         lef_data: Optional LEF data for macro information
         tlef_data: Optional TLEF data for technology information
     """
+    # Sections are built up in a list and written once at the end; per-line
+    # f.write() calls through the text layer dominate on large designs.
+    out = []
+    write = out.append
     with open(output_file, 'w') as f:
         # ======================================
         # Header Section - DEF 5.8 Compliant
         # ======================================
-        f.write("VERSION 5.8 ;\n")
-        f.write("\n")
+        write("VERSION 5.8 ;\n")
+        write("\n")
 
         # Extract divider and busbit chars from LEF/TLEF if available
         dividerchar = "/"
@@ -1132,22 +1146,22 @@ def write_def_file(design_name: str,
             dividerchar = tlef_data.get('dividerchar', '/')
             busbitchars = tlef_data.get('busbitchars', '[]')
 
-        f.write(f"DIVIDERCHAR \"{dividerchar}\" ;\n")
-        f.write(f"BUSBITCHARS \"{busbitchars}\" ;\n")
-        f.write("\n")
+        write(f"DIVIDERCHAR \"{dividerchar}\" ;\n")
+        write(f"BUSBITCHARS \"{busbitchars}\" ;\n")
+        write("\n")
 
         # Design name
-        f.write(f"DESIGN {design_name} ;\n")
-        f.write("\n")
+        write(f"DESIGN {design_name} ;\n")
+        write("\n")
 
         # Units specification - Use 1000 DBU/micron (standard for DEF files)
-        f.write(f"UNITS DISTANCE {coords} 1000 ;\n")
-        f.write("\n")
+        write(f"UNITS DISTANCE {coords} 1000 ;\n")
+        write("\n")
 
         # Die area - use full coordinates (pins will be halved separately)
         llx, lly, urx, ury = die_area
-        f.write(f"DIEAREA ( {llx} {lly} ) ( {urx} {ury} ) ;\n")
-        f.write("\n")
+        write(f"DIEAREA ( {llx} {lly} ) ( {urx} {ury} ) ;\n")
+        write("\n")
 
         # ======================================
         # ROWS Section - DEF 5.8 Format
@@ -1186,13 +1200,13 @@ def write_def_file(design_name: str,
                 
                 for row_idx in range(enhanced_num_rows_y):
                     y_pos = lly + row_idx * enhanced_row_height
-                    f.write(f"ROW ROW_{row_idx} {core_site} {llx} {y_pos} N DO {num_sites_x} BY 1 STEP {site_width_dbu} 0 ;\n")
+                    write(f"ROW ROW_{row_idx} {core_site} {llx} {y_pos} N DO {num_sites_x} BY 1 STEP {site_width_dbu} 0 ;\n")
         
-        f.write("\n")
+        write("\n")
 
         # TRACKS Section intentionally omitted per request.
         # Routing grids will be inferred from technology files or set in OpenROAD.
-        f.write("\n")
+        write("\n")
 
         # ======================================
         # Components Section - DEF 5.8 Format (BEFORE PINS)
@@ -1205,15 +1219,16 @@ def write_def_file(design_name: str,
         #    [+ WEIGHT weight]
         #  ; ] ...
         # END COMPONENTS
-        f.write(f"COMPONENTS {len(components)} ;\n")
-        for comp in sorted(components, key=lambda c: c['name']):
+        write(f"COMPONENTS {len(components)} ;\n")
+        for comp in sorted(components, key=itemgetter('name')):
             # Compact format: - name model + FIXED (x y) orient ;
             if comp['status'] == 'UNPLACED':
-                f.write(f"  - {comp['name']} {comp['model']} + UNPLACED ;\n")
+                write(DEF_COMP_UNPLACED_FMT % (comp['name'], comp['model']))
             else:
-                f.write(f"  - {comp['name']} {comp['model']} + {comp['status']} ( {comp['x']} {comp['y']} ) {comp.get('orient', 'N')} ;\n")
-        f.write("END COMPONENTS\n")
-        f.write("\n")
+                write(DEF_COMP_FMT % (comp['name'], comp['model'], comp['status'],
+                                      comp['x'], comp['y'], comp.get('orient', 'N')))
+        write("END COMPONENTS\n")
+        write("\n")
 
  
         # ======================================
@@ -1244,7 +1259,7 @@ def write_def_file(design_name: str,
                 net_name = net_info.get('name', f'net_{net_id}')
                 net_id_to_name[str(net_id)] = str(net_name)
         
-        f.write(f"PINS {len(pins)} ;\n")
+        write(f"PINS {len(pins)} ;\n")
         
         # Debug: log pin coordinates and die area
         print(f"\n[DEBUG] PIN COORDINATE ANALYSIS:")
@@ -1254,7 +1269,7 @@ def write_def_file(design_name: str,
         print(f"  Total pins: {len(pins)}\n")
         
         pin_debug_count = 0
-        for pin in sorted(pins, key=lambda p: p['name']):
+        for pin in sorted(pins, key=itemgetter('name')):
             # Convert net ID to net name
             net_id = str(pin['net'])
             net_name = net_id_to_name.get(net_id, net_id)
@@ -1361,25 +1376,22 @@ def write_def_file(design_name: str,
             
             # No clamping/snapping: keep rectangle as computed
             
-            f.write(f"  - {pin['name']} + NET {net_name}\n")
-            f.write(f"    + DIRECTION {pin['direction']}\n")
-            f.write(f"    + USE {pin.get('use', 'SIGNAL')}\n")
-            f.write(f"    + PORT\n")
-            f.write(f"      + LAYER {pin_layer}\n")
-            f.write(f"        ( {x1} {y1} ) ( {x2} {y2} )\n")
             # Use PLACED for pins as requested
-            f.write(f"      + PLACED ( {x_coord} {y_coord} ) {pin.get('orient', 'N')} ;\n")
-        f.write("END PINS\n")
-        f.write("\n")
+            write(DEF_PIN_FMT % (pin['name'], net_name, pin['direction'],
+                                 pin.get('use', 'SIGNAL'), pin_layer,
+                                 x1, y1, x2, y2,
+                                 x_coord, y_coord, pin.get('orient', 'N')))
+        write("END PINS\n")
+        write("\n")
 
         # ======================================
         # BLOCKAGE Section - Reduce routing congestion
         # ======================================
         # Add blockages to prevent signal routing through dense tie-cell regions
         # This helps the router avoid congestion without changing cell placement
-        f.write("BLOCKAGES 0 ;\n")
-        f.write("END BLOCKAGES\n")
-        f.write("\n")
+        write("BLOCKAGES 0 ;\n")
+        write("END BLOCKAGES\n")
+        write("\n")
 
         # ======================================
         # Nets Section - DEF 5.8 Format (AFTER PINS)
@@ -1429,6 +1441,7 @@ def write_def_file(design_name: str,
             nets[net_name].append(('PIN', pin_name))
         
         # 2. Add component pins from logical_db if available
+        top_pin_names = {p['name'] for p in pins}
         if logical_db and 'nets' in logical_db:
             for net_id, net_info in logical_db['nets'].items():
                 # Use the net name instead of ID
@@ -1438,17 +1451,23 @@ def write_def_file(design_name: str,
                 # Add all component pins to the net
                 for inst_name, pin_name in net_connections:
                     # Skip top-level pins (already added above in step 1)
-                    if inst_name not in [p['name'] for p in pins]:
+                    if inst_name not in top_pin_names:
                         # Add component pin reference
                         nets[net_name].append(('COMPONENT', inst_name, pin_name))
         
         # Sort nets by name for consistent output (convert keys to strings for sorting)
-        sorted_nets = sorted(nets.items(), key=lambda x: str(x[0]))
+        sorted_nets = sorted(nets.items(), key=lambda kv: str(kv[0]))
         
-        f.write(f"NETS {len(sorted_nets)} ;\n")
+        # Lookups hoisted out of the per-terminal loop: the cells dict's .get,
+        # the LEF macros, and the LEF output pin per cell type
+        cells_get = logical_db['cells'].get if logical_db and 'cells' in logical_db else {}.get
+        lef_macros = lef_data['macros'] if lef_data and 'macros' in lef_data else None
+        output_pin_by_type = {}
+
+        write(f"NETS {len(sorted_nets)} ;\n")
         for net_name, terminals in sorted_nets:
             # Start net definition
-            f.write(f"  - {net_name}\n")
+            write(f"  - {net_name}\n")
             
             # Check if this is a clock net (contains clk pin OR net name starts with 'clk')
             has_clk_pin = any(terminal[0] == 'PIN' and terminal[1] == 'clk' for terminal in terminals)
@@ -1463,26 +1482,27 @@ def write_def_file(design_name: str,
                 if terminal[0] == 'PIN':
                     # Top-level pin reference
                     pin_name = terminal[1]
-                    f.write(f"      ( PIN {pin_name} )\n")
+                    write(DEF_NET_PIN_FMT % pin_name)
                 elif terminal[0] == 'COMPONENT':
                     # Component pin reference: ( compName pinName )
                     inst_name = terminal[1]
                     pin_name = terminal[2]
                     
                     # Get the cell type for this instance
-                    cell_type = None
-                    if logical_db and 'cells' in logical_db:
-                        if inst_name in logical_db['cells']:
-                            cell_type = logical_db['cells'][inst_name].get('type')
+                    cell_info = cells_get(inst_name)
+                    cell_type = cell_info.get('type') if cell_info is not None else None
                     
                     # Correct the pin name based on LEF data for output pins
                     # If the pin name from netlist is 'Y' but cell type has different output, use LEF
-                    if cell_type and pin_name == 'Y' and lef_data and 'macros' in lef_data:
-                        corrected_pin = get_output_pin_name(cell_type, lef_data['macros'])
+                    if cell_type and pin_name == 'Y' and lef_macros is not None:
+                        corrected_pin = output_pin_by_type.get(cell_type)
+                        if corrected_pin is None:
+                            corrected_pin = get_output_pin_name(cell_type, lef_macros)
+                            output_pin_by_type[cell_type] = corrected_pin
                         if corrected_pin != 'Y':
                             pin_name = corrected_pin
                     
-                    f.write(f"      ( {inst_name} {pin_name} )\n")
+                    write(DEF_NET_CONN_FMT % (inst_name, pin_name))
             
             # Add net properties to guide routing and reduce congestion
             net_properties = []
@@ -1495,17 +1515,20 @@ def write_def_file(design_name: str,
             
             # Add properties together
             if net_properties:
-                f.write(" ".join(net_properties) + " ;\n")
+                write(" ".join(net_properties) + " ;\n")
             else:
-                f.write("    ;\n")
+                write("    ;\n")
         
-        f.write("END NETS\n")
+        write("END NETS\n")
 
         # ======================================
         # End Design Section
         # ======================================
-        f.write("\n")
-        f.write("END DESIGN\n")
+        write("\n")
+        write("END DESIGN\n")
+
+        # Emit the whole file in one call instead of one per line
+        f.write(''.join(out))
 
 
 def main():
@@ -1645,31 +1668,22 @@ def main():
     # Build placement data structure from placement map file for $ cell lookup
     placement_data = {}
     if os.path.exists(placement_map_file):
-        with open(placement_map_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line or '->' not in line:
-                    continue
-                parts = line.split('->')
-                if len(parts) != 2:
-                    continue
-                left = parts[0].strip().split()
-                logical_inst = parts[1].strip()
-                if len(left) >= 3:
-                    fabric_cell = left[0]
-                    cell_type = left[1]
-                    try:
-                        x_coord = float(left[2])
-                        y_coord = float(left[3]) if len(left) > 3 else 0.0
-                        placement_data[logical_inst] = {
-                            'fabric_cell': fabric_cell,
-                            'cell_type': cell_type,
-                            'x': x_coord,
-                            'y': y_coord,
-                            'orient': 'N'
-                        }
-                    except (ValueError, IndexError):
-                        pass
+        for left, logical_inst in read_placement_records(placement_map_file):
+            if len(left) >= 3:
+                fabric_cell = left[0]
+                cell_type = left[1]
+                try:
+                    x_coord = float(left[2])
+                    y_coord = float(left[3]) if len(left) > 3 else 0.0
+                    placement_data[logical_inst] = {
+                        'fabric_cell': fabric_cell,
+                        'cell_type': cell_type,
+                        'x': x_coord,
+                        'y': y_coord,
+                        'orient': 'N'
+                    }
+                except (ValueError, IndexError):
+                    pass
     print(f"  Built placement data for {len(placement_data)} instances from map")
 
     # Load leakage database for power-down ECO
@@ -1708,8 +1722,11 @@ def main():
 
         print(f"  CTS placement written to: {cts_placement_file}")
 
-        # Reload placement map after CTS for both directions
-        logical_to_fabric, fabric_to_logical = load_placement_map(cts_placement_file)
+        # CTS already holds the updated placement; take both directions (and
+        # the ECO's logical -> fabric map) from memory instead of re-parsing
+        # the file just written
+        logical_to_fabric, fabric_to_logical = cts.placement_maps()
+        placement_map_dict = cts.placement_mapping()
 
         # Use CTS placement for subsequent steps
         placement_map_file = cts_placement_file
@@ -1717,6 +1734,7 @@ def main():
         print("\n[2/6] Skipping CTS (--no-cts)")
         # Load original placement map
         logical_to_fabric, fabric_to_logical = load_placement_map(placement_map_file)
+        placement_map_dict = None
 
     # ========================================
     # Run ECO
@@ -1725,7 +1743,8 @@ def main():
         print("\n[3/6] Running Power-Down ECO...")
 
         # Load placement mapping in the format expected by power_down_eco
-        placement_map_dict = load_placement_mapping(placement_map_file)
+        if placement_map_dict is None:
+            placement_map_dict = load_placement_mapping(placement_map_file)
 
         # Run ECO with pre-built databases
         logical_db, eco_report = run_power_down_eco(
@@ -47,6 +47,9 @@ class SAConfig:
         # Range-limiting window for Explore moves
         self.w_initial = 0.3            # Initial window size (50% of die width)
 
+        # RNG seed; None uses the global `random` module state
+        self.seed = None
+
 
 # ===============================================================
 # 2. Utility Functions
@@ -104,7 +107,7 @@ def get_fabric_dimensions(fabric_db):
 # 3. Move Generation Functions
 # ===============================================================
 
-def refine_move(placement_dict, logical_db):
+def refine_move(placement_dict, logical_db, rng=random):
     """
     REFINE: Swap two randomly selected cells.
     Returns (cell1, cell2, pos1, pos2) or None if invalid.
@@ -115,7 +118,7 @@ def refine_move(placement_dict, logical_db):
     if len(cells) < 2:
         return None
     
-    cell1, cell2 = random.sample(cells, 2)
+    cell1, cell2 = rng.sample(cells, 2)
     pos1 = placement_dict[cell1]  # (slot_name, cell_type, x, y)
     pos2 = placement_dict[cell2]
     
@@ -126,7 +129,7 @@ def refine_move(placement_dict, logical_db):
     return (cell1, cell2, pos1, pos2)
 
 
-def explore_move(placement_dict, fabric_db, logical_db, netlist_graph, window_size=None):
+def explore_move(placement_dict, fabric_db, logical_db, netlist_graph, window_size=None, rng=random):
     """
     EXPLORE: Move one cell to a nearby available slot (guided by neighbors).
     Returns (cell, old_pos, new_pos) or None if no slots available.
@@ -145,7 +148,7 @@ def explore_move(placement_dict, fabric_db, logical_db, netlist_graph, window_si
     if not cells:
         return None
     
-    cell = random.choice(cells)
+    cell = rng.choice(cells)
     old_pos = placement_dict[cell]  # (slot_name, cell_type, x, y)
     old_x, old_y = old_pos[2], old_pos[3]
     required_type = old_pos[1]
@@ -185,7 +188,7 @@ def explore_move(placement_dict, fabric_db, logical_db, netlist_graph, window_si
         # Pick from top 5 closest slots (some randomness)
         available_sorted = sorted(available, key=distance)
         candidates = available_sorted[:min(5, len(available_sorted))]
-        new_slot_name, new_cell_type, new_x, new_y = random.choice(candidates)
+        new_slot_name, new_cell_type, new_x, new_y = rng.choice(candidates)
     else:
         # No neighbors, pick randomly but close to current position
         def distance(slot_info):
@@ -194,31 +197,32 @@ def explore_move(placement_dict, fabric_db, logical_db, netlist_graph, window_si
         
         available_sorted = sorted(available, key=distance)
         candidates = available_sorted[:min(5, len(available_sorted))]
-        new_slot_name, new_cell_type, new_x, new_y = random.choice(candidates)
+        new_slot_name, new_cell_type, new_x, new_y = rng.choice(candidates)
     
     new_pos = (new_slot_name, new_cell_type, new_x, new_y)
     
     return (cell, old_pos, new_pos)
 
 
-def generate_move(placement_dict, fabric_db, logical_db, netlist_graph, config, window_size=None):
+def generate_move(placement_dict, fabric_db, logical_db, netlist_graph, config, window_size=None, rng=random):
     """
     Generate a random move based on configured probabilities.
     Returns (move_type, move_data) or (None, None).
     
     Args:
         window_size: Range-limiting window size for Explore moves.
+        rng: Random source (module `random` or a random.Random instance).
     """
-    rand_val = random.random()
+    rand_val = rng.random()
     
     if rand_val < config.prob_refine:
         # REFINE: Swap two cells
-        move_data = refine_move(placement_dict, logical_db)
+        move_data = refine_move(placement_dict, logical_db, rng)
         if move_data:
             return ("refine", move_data)
     else:
         # EXPLORE: Shift one cell (with optional window size)
-        move_data = explore_move(placement_dict, fabric_db, logical_db, netlist_graph, window_size)
+        move_data = explore_move(placement_dict, fabric_db, logical_db, netlist_graph, window_size, rng)
         if move_data:
             return ("explore", move_data)
     
@@ -269,7 +273,7 @@ def revert_move(placement_dict, move_type, move_data):
 # 5. Acceptance Criterion
 # ===============================================================
 
-def accept_move(delta_cost, temperature):
+def accept_move(delta_cost, temperature, rng=random):
     """
     Metropolis acceptance criterion.
     Always accept if cost improves (delta < 0).
@@ -282,7 +286,7 @@ def accept_move(delta_cost, temperature):
         return False
     
     probability = math.exp(-delta_cost / temperature)
-    return random.random() < probability
+    return rng.random() < probability
 
 
 # ===============================================================
@@ -307,6 +311,9 @@ def simulated_annealing(fabric_db, logical_db, netlist_graph, initial_placement_
     if config is None:
         config = SAConfig()
     
+    # Private RNG when seeded so concurrent runs never share the global state
+    rng = random.Random(config.seed) if config.seed is not None else random
+    
     # Initialize with greedy placement
     current_placement = copy.deepcopy(initial_placement_dict)
     best_placement = copy.deepcopy(initial_placement_dict)
@@ -361,7 +368,7 @@ def simulated_annealing(fabric_db, logical_db, netlist_graph, initial_placement_
             
             # Generate a move with current window size
             move_type, move_data = generate_move(
-                current_placement, fabric_db, logical_db, netlist_graph, config, current_window
+                current_placement, fabric_db, logical_db, netlist_graph, config, current_window, rng
             )
             
             if move_type is None:
@@ -382,7 +389,7 @@ def simulated_annealing(fabric_db, logical_db, netlist_graph, initial_placement_
             delta_cost = new_cost - current_cost
             
             # Decide whether to accept
-            if accept_move(delta_cost, temperature):
+            if accept_move(delta_cost, temperature, rng):
                 # Accept the move
                 current_cost = new_cost
                 stats["accepted_moves"] += 1
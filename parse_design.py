@@ -21,6 +21,17 @@ from collections import defaultdict
 from typing import Dict, Any, Tuple
 import networkx as nx
 
+try:
+    import orjson
+except ImportError:  # optional; falls back to stdlib json
+    orjson = None
+
+from db_cache import input_signature, cache_file, load_cached, store_cached, advise_sequential
+
+# Part of the logical_db/netlist_graph cache signature; bump whenever the
+# parser's output changes so caches written by older code are rebuilt
+DESIGN_CACHE_VERSION = 1
+
 
 # ===============================================================
 # 1. Utility Helpers
@@ -49,17 +60,43 @@ def _find_top_module(modules: Dict[str, Any]) -> Tuple[str, Dict]:
 # 2. Main Parser
 # ===============================================================
 
-def parse_design_json(json_path: str) -> Tuple[Dict[str, Any], nx.Graph]:
+def parse_design_json(json_path: str, use_cache: bool = True) -> Tuple[Dict[str, Any], nx.Graph]:
     """
     Parse a Yosys *_mapped.json file and construct logical_db + netlist_graph.
 
+    The result is pickled under build/.cache and reused while the JSON and
+    DESIGN_CACHE_VERSION are unchanged.
+
     Args:
         json_path (str): path to the JSON netlist
+        use_cache (bool): read/write the pickle cache
     Returns:
         logical_db (dict), netlist_graph (nx.Graph)
     """
-    with open(json_path, "r") as f:
-        data = json.load(f)
+    cache_path = cache_file(os.path.splitext(os.path.basename(json_path))[0], json_path)
+    signature = input_signature(json_path, version=DESIGN_CACHE_VERSION) if use_cache else None
+
+    cached = load_cached(cache_path, signature)
+    if cached is not None:
+        return cached
+
+    logical_db, netlist_graph = _parse_design_json(json_path)
+    store_cached(cache_path, signature, (logical_db, netlist_graph))
+    return logical_db, netlist_graph
+
+
+def _parse_design_json(json_path: str) -> Tuple[Dict[str, Any], nx.Graph]:
+    """Uncached parse of a Yosys *_mapped.json file."""
+    # orjson parses the raw bytes directly (several times faster on large
+    # netlists); stdlib json otherwise
+    if orjson is not None:
+        with open(json_path, "rb") as f:
+            advise_sequential(f)
+            data = orjson.loads(f.read())
+    else:
+        with open(json_path, "r") as f:
+            advise_sequential(f)
+            data = json.load(f)
 
     modules = data.get("modules", {})
     if not modules:
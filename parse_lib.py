@@ -340,9 +340,10 @@ def load_tie_database(tie_db_file: str) -> Dict[str, str]:
         {cell_type: "HI" or "LO"}
     """
     import yaml
+    from build_fabric_db import YAML_LOADER
     
     with open(tie_db_file, 'r') as f:
-        tie_db = yaml.safe_load(f)
+        tie_db = yaml.load(f, Loader=YAML_LOADER)
     
     # Simplify to just cell_type -> tie mapping
     return {cell: data["tie"] for cell, data in tie_db.items()}
@@ -256,7 +256,7 @@ def write_map_file(placement_dict, fabric_db, filename="placement.map"):
     For cells: slot_name  cell_type  x y  ->  logical_cell_name
     For unused slots: slot_name  cell_type  x y  ->  UNUSED
     """
-    with open(filename, "w") as f:
+    with open(filename, "w", buffering=1 << 20) as f:
         # First write all pins (sorted for consistency)
         pin_entries = [(name, data) for name, data in placement_dict.items()
                       if data[1] == "PIN"]
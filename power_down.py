@@ -32,11 +32,13 @@ import yaml
 import sys
 import os
 from collections import defaultdict
+from functools import lru_cache
 from typing import Dict, Any, List, Set, Tuple, Optional
 
 # Import the parsing modules
 from parse_design import parse_design_json
-from build_fabric_db import build_fabric_db
+from build_fabric_db import build_fabric_db, YAML_LOADER
+from db_cache import advise_sequential
 from parse_lib import parse_liberty_leakage, get_optimal_tie_for_cell, heuristic_tie_selection
 
 
@@ -229,6 +231,37 @@ def get_cell_input_pins(cell_type: str, fabric_db: Dict[str, Any] = None) -> Lis
 # Placement Mapping
 # ===============================================================
 
+@lru_cache(maxsize=8)
+def _read_map_records(placement_file: str, mtime_ns: int, size: int) -> Tuple[Tuple[Tuple[str, ...], str], ...]:
+    """Parse a .map file once per (path, mtime, size); see read_placement_records."""
+    records = []
+    with open(placement_file, 'r') as f:
+        advise_sequential(f)
+        for line in f:
+            # Split once on '->'; lines without exactly one arrow are skipped
+            left, sep, right = line.partition('->')
+            if not sep or '->' in right:
+                continue
+            fields = left.split()
+            if fields:
+                records.append((tuple(fields), right.strip()))
+    return tuple(records)
+
+
+def read_placement_records(placement_file: str) -> Tuple[Tuple[Tuple[str, ...], str], ...]:
+    """
+    Read the mapping lines of a .map placement file.
+
+    Each record is (left_fields, logical_instance), where left_fields is the
+    whitespace-split text before '->' (fabric_cell, cell_type, x, y, ...).
+    Results are memoized on the file's mtime and size, so the loaders that
+    project the same map into different shapes share one parse per run.
+    The returned tuple is shared and must not be modified.
+    """
+    st = os.stat(placement_file)
+    return _read_map_records(placement_file, st.st_mtime_ns, st.st_size)
+
+
 def load_placement_mapping(placement_file: str = None) -> Dict[str, str]:
     """
     Load the placement mapping: logical_instance -> fabric_cell.
@@ -246,31 +279,19 @@ def load_placement_mapping(placement_file: str = None) -> Dict[str, str]:
 
     placement_map = {}
 
+    if placement_file.endswith('.map'):
+        # Parse .map format:
+        # fabric_cell  cell_type  x  y  ->  logical_instance
+        for left_part, logical_inst in read_placement_records(placement_file):
+            # Map: logical_instance -> fabric_cell
+            placement_map[logical_inst] = left_part[0]
+        return placement_map
+
     with open(placement_file, 'r') as f:
         if placement_file.endswith('.json'):
             placement_map = json.load(f)
         elif placement_file.endswith(('.yaml', '.yml')):
-            placement_map = yaml.safe_load(f)
-        elif placement_file.endswith('.map'):
-            # Parse .map format:
-            # fabric_cell  cell_type  x  y  ->  logical_instance
-            for line in f:
-                line = line.strip()
-                if not line or '->' not in line:
-                    continue
-
-                # Split on '->'
-                parts = line.split('->')
-                if len(parts) != 2:
-                    continue
-
-                left_part = parts[0].strip().split()
-                logical_inst = parts[1].strip()
-
-                if len(left_part) >= 1:
-                    fabric_cell = left_part[0]
-                    # Map: logical_instance -> fabric_cell
-                    placement_map[logical_inst] = fabric_cell
+            placement_map = yaml.load(f, Loader=YAML_LOADER)
         else:
             print(f"Warning: Unknown placement file format: {placement_file}")
 
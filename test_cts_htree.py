@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Checks for the CTS nearest-resource search.
+
+find_nearest_resource must pick the same resource as a full linear scan
+(float32 squared distance, lowest index on ties) whether it runs on the
+k-d tree or on the bucket grid. Ties are the normal case on a structured
+ASIC, where resources sit on a regular site grid.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+import cts_htree
+from cts_htree import HTreeCTS
+
+
+def _make_cts(resources):
+    """HTreeCTS holding only a resource list (no fabric/netlist needed)."""
+    cts = HTreeCTS.__new__(HTreeCTS)
+    cts.resources = resources
+    cts._build_resource_arrays()
+    return cts
+
+
+def _grid_resources(pitch, nx_sites=25, ny_sites=25, seed=0):
+    """Resources on a regular (x, y) pitch grid, buffers and inverters mixed."""
+    rng = np.random.default_rng(seed)
+    resources = []
+    for i in range(nx_sites):
+        for j in range(ny_sites):
+            resources.append({
+                'name': f"r{len(resources)}",
+                'x': round(i * pitch[0], 2),
+                'y': round(j * pitch[1], 2),
+                'claimed': False,
+                'is_buffer': bool(rng.random() < 0.6),
+            })
+    rng.shuffle(resources)
+    for n, r in enumerate(resources):
+        r['name'] = f"r{n}"
+    return resources
+
+
+def _linear_scan(cts, x, y, prefer_buffer=True):
+    """Reference: vectorized full scan over every resource."""
+    candidates = ~cts._res_claimed
+    if prefer_buffer:
+        buffers = candidates & cts._res_is_buffer
+        if buffers.any():
+            candidates = buffers
+    if not candidates.any():
+        return None
+    dx = cts._res_x - x
+    dy = cts._res_y - y
+    d2 = dx * dx + dy * dy
+    d2[~candidates] = np.inf
+    return cts.resources[int(np.argmin(d2))]
+
+
+# Unit pitch gives exact ties; the sky130 site pitch gives ties that only
+# hold after float32 rounding of the coordinates
+@pytest.mark.parametrize("pitch", [(1.0, 1.0), (0.46, 2.72)])
+@pytest.mark.parametrize("use_tree", [True, False])
+def test_nearest_resource_matches_linear_scan_on_grid(monkeypatch, use_tree, pitch):
+    if use_tree and cts_htree.cKDTree is None:
+        pytest.skip("scipy not installed")
+    if not use_tree:
+        monkeypatch.setattr(cts_htree, "cKDTree", None)
+
+    cts = _make_cts(_grid_resources(pitch))
+    px, py = pitch
+
+    # Repeated queries at a few centres claim whole rings of equidistant
+    # sites (up to 12 at distance 5), so ties run past the k-d tree's first
+    # KDTREE_K neighbours; the rest land on, between and outside the sites
+    rng = np.random.default_rng(1)
+    scattered = [(round(x * px, 2), round(y * py, 2))
+                 for x in np.arange(-1.0, 26.0, 0.5)
+                 for y in np.arange(-1.0, 26.0, 0.5)]
+    rng.shuffle(scattered)
+    centres = [(12.0, 12.0)] * 150 + [(5.0, 5.0)] * 60 + [(18.5, 6.5)] * 60
+    queries = [(round(x * px, 2), round(y * py, 2)) for x, y in centres] + scattered
+
+    for n, (x, y) in enumerate(queries):
+        prefer_buffer = n % 3 != 0
+        expected = _linear_scan(cts, x, y, prefer_buffer)
+        got = cts.find_nearest_resource(x, y, prefer_buffer)
+        assert got is expected, (x, y, prefer_buffer)
+        if got is None:
+            break
+        # Claim as CTS does, so later queries see a thinning grid
+        cts.claim_resource(got)
+
+    assert all(r['claimed'] for r in cts.resources)
+    assert cts.find_nearest_resource(0.0, 0.0) is None
+
+
+def _split_placement_map(placement_file):
+    """Reference: the original split()-based parse_placement_map."""
+    io_ports = {}
+    fabric_cells = {}
+    with open(placement_file, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if '->' in line:
+                parts = line.split('->')
+                left_parts = parts[0].strip().split()
+                if len(left_parts) < 4:
+                    continue
+                try:
+                    x = float(left_parts[2])
+                    y = float(left_parts[3])
+                except (ValueError, IndexError):
+                    continue
+                mapped_cell = parts[1].strip()
+                fabric_cells[left_parts[0]] = {
+                    'type': left_parts[1],
+                    'x': x,
+                    'y': y,
+                    'mapped': mapped_cell,
+                    'is_unused': (mapped_cell == 'UNUSED')
+                }
+            else:
+                parts = line.split()
+                if len(parts) >= 3:
+                    try:
+                        io_ports[parts[0]] = (float(parts[1]), float(parts[2]))
+                    except ValueError:
+                        continue
+    return io_ports, fabric_cells
+
+
+def _assert_same_placement(placement_file):
+    io_ports, fabric_cells = cts_htree.parse_placement_map(placement_file)
+    ref_ports, ref_cells = _split_placement_map(placement_file)
+    # repr() so that nan coordinates compare equal
+    assert repr(io_ports) == repr(ref_ports)
+    assert list(fabric_cells) == list(ref_cells)
+    assert repr({name: fabric_cells[name] for name in fabric_cells}) == repr(ref_cells)
+
+
+@pytest.mark.parametrize("placement_file", [
+    "placement.map", "placement_greedy_initial.map", "placement_sa_optimized.map"])
+def test_parse_placement_map_matches_split_parser(placement_file):
+    if not os.path.exists(placement_file):
+        pytest.skip(f"{placement_file} not present")
+    _assert_same_placement(placement_file)
+
+
+PLACEMENT_EDGE_LINES = """\
+T0_0__R0_NAND_0 sky130_fd_sc_hd__nand2_2 10.5 20.25 -> U1
+  T0_0__R0_BUF_0\tsky130_fd_sc_hd__clkbuf_4   1e2 -3.5E-1   ->   UNUSED  \r
+T0_0__R0_INV_0 sky130_fd_sc_hd__inv_2 .5 7. -> a b
+T0_0__R0_INV_1 sky130_fd_sc_hd__inv_2 1 2 extra fields -> m -> n
+T0_0__R0_INV_2 sky130_fd_sc_hd__inv_2 1 2->tight
+T0_0__R0_INV_3 sky130_fd_sc_hd__inv_2 1 2 ->
+T0_0__R0_INV_4 sky130_fd_sc_hd__inv_2 1 2 x->->y
+T0_0__R0_INV_5 sky130_fd_sc_hd__inv_2 1 2 x->y z -> w
+T0_0__R0_DFF_0 sky130_fd_sc_hd__dfxtp_1 nan inf -> ff
+T0_0__R0_DFF_1 sky130_fd_sc_hd__dfxtp_1 -Infinity +NaN -> ff1
+T0_0__R0_DFF_2 sky130_fd_sc_hd__dfxtp_1 1_0 2_000.5_5 -> ff2
+T0_0__R0_BAD_0 sky130_fd_sc_hd__inv_2 1x 2 -> bad
+T0_0__R0_BAD_1 sky130_fd_sc_hd__inv_2 1__0 2 -> bad
+T0_0__R0_BAD_2 sky130_fd_sc_hd__inv_2 1 2-3 -> bad
+T0_0__R0_BAD_3 sky130_fd_sc_hd__inv_2 1e 2 -> bad
+T0_0__R0_BAD_4 sky130_fd_sc_hd__inv_2 infx 2 -> bad
+a->b T 1 2 -> bad
+T0_0__R0_BAD_5 3 -> bad
+T0_0__R0_NAND_0 sky130_fd_sc_hd__nand2_2 11 21 -> U1_again
+
+clk 0.0 50.0
+rst -1.5 +2e1 extra
+in[0] inf -nan
+port_bad 1.0
+port_bad2 1.0 two
+port_bad3 _1 2
+"""
+
+
+def test_parse_placement_map_edge_lines_match_split_parser(tmp_path):
+    placement_file = tmp_path / "placement.map"
+    placement_file.write_bytes(PLACEMENT_EDGE_LINES.encode())
+    _assert_same_placement(str(placement_file))
+
+
+def test_fabric_cell_store_from_columns_duplicate_names():
+    store = cts_htree.FabricCellStore.from_columns(
+        ['a', 'b', 'a'],
+        ['sky130_fd_sc_hd__inv_2', 'sky130_fd_sc_hd__buf_1', 'sky130_fd_sc_hd__dfbbp_1'],
+        [1.0, 2.0, 3.0], [4.0, 5.0, 6.0], ['U1', 'UNUSED', 'U3'])
+
+    # Later rows overwrite earlier ones, keeping the first position, as a dict would
+    assert list(store) == ['a', 'b']
+    assert len(store) == 2
+    assert store['a'] == {'type': 'sky130_fd_sc_hd__dfbbp_1', 'x': 3.0, 'y': 6.0,
+                          'mapped': 'U3', 'is_unused': False}
+    assert store.x.tolist() == [3.0, 2.0]
+    assert store.is_unused.tolist() == [False, True]
+    assert store.kind.tolist() == [cts_htree.CELL_DFF, cts_htree.CELL_BUF]
+
+
+def test_fabric_cell_store_overwrite_existing_key():
+    store = cts_htree.FabricCellStore.from_columns(
+        ['a', 'b'], ['sky130_fd_sc_hd__inv_2', 'sky130_fd_sc_hd__buf_1'],
+        [1.0, 2.0], [4.0, 5.0], ['U1', 'U2'])
+    assert store.x.tolist() == [1.0, 2.0]
+
+    store['a'] = {'type': 'sky130_fd_sc_hd__dfbbp_1', 'x': 9.0, 'y': 8.0, 'mapped': 'UNUSED'}
+
+    assert list(store) == ['a', 'b']
+    assert store['a'] == {'type': 'sky130_fd_sc_hd__dfbbp_1', 'x': 9.0, 'y': 8.0,
+                          'mapped': 'UNUSED', 'is_unused': True}
+    # Cached column arrays are rebuilt after the write
+    assert store.x.tolist() == [9.0, 2.0]
+    assert store.y.tolist() == [8.0, 5.0]
+    assert store.is_unused.tolist() == [True, False]
+    assert store.kind.tolist() == [cts_htree.CELL_DFF, cts_htree.CELL_BUF]
+
+
+def test_fabric_cell_store_rows_are_fresh_copies():
+    store = cts_htree.FabricCellStore.from_columns(
+        ['a'], ['sky130_fd_sc_hd__inv_2'], [1.0], [2.0], ['U1'])
+
+    row = store['a']
+    assert row is not store['a']
+    row['x'] = 100.0
+    row['mapped'] = 'UNUSED'
+    assert store['a']['x'] == 1.0
+    assert store['a']['mapped'] == 'U1'
+    assert store.x.tolist() == [1.0]
+
+
+def test_augment_with_unused_ffs_rebuilds_columns():
+    cts = HTreeCTS.__new__(HTreeCTS)
+    cts.fabric_cells = cts_htree.FabricCellStore.from_columns(
+        ['ff0', 'buf0'], ['sky130_fd_sc_hd__dfbbp_1', 'sky130_fd_sc_hd__clkbuf_4'],
+        [1.0, 2.0], [3.0, 4.0], ['U1', 'UNUSED'])
+    cts.fabric_db = {'fabric': {'cells_by_tile': {
+        'T0_0': {'cells': [
+            {'name': 'ff0', 'cell_type': 'sky130_fd_sc_hd__dfbbp_1', 'x': 1.0, 'y': 3.0},
+            {'name': 'ff1', 'cell_type': 'sky130_fd_sc_hd__dfbbp_1', 'x': 5.0, 'y': 6.0},
+            {'name': 'inv0', 'cell_type': 'sky130_fd_sc_hd__inv_2', 'x': 7.0, 'y': 8.0},
+        ]},
+    }}}
+    # Build the column arrays before augmenting so the rebuild is exercised
+    assert cts.fabric_cells.x.tolist() == [1.0, 2.0]
+
+    assert cts.augment_fabric_cells_with_unused_ffs() == 1
+
+    store = cts.fabric_cells
+    assert list(store) == ['ff0', 'buf0', 'ff1']
+    assert store.x.tolist() == [1.0, 2.0, 5.0]
+    assert store.y.tolist() == [3.0, 4.0, 6.0]
+    assert store.is_unused.tolist() == [False, True, True]
+    assert store.kind.tolist() == [cts_htree.CELL_DFF, cts_htree.CELL_BUF, cts_htree.CELL_DFF]
+    assert store['ff1'] == {'type': 'sky130_fd_sc_hd__dfbbp_1', 'x': 5.0, 'y': 6.0,
+                            'mapped': 'UNUSED', 'is_unused': True}
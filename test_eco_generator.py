@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Checks for the ECO generator's LEF pin reader.
+
+_read_lef_pins replaced a regex parser that matched MACRO/PIN blocks with
+re.DOTALL | re.IGNORECASE; both must report the same pins for every macro,
+including when a LEF spells the names after END in a different case.
+"""
+
+import re
+
+from eco_generator import _read_lef_pins
+
+
+def _regex_lef_pins(text):
+    """Reference: the original regex-based parse_lef_for_pins."""
+    cell_pins = {}
+    macro_pattern = r'MACRO\s+(\S+)\s*\n(.*?)END\s+\1'
+    for macro_match in re.finditer(macro_pattern, text, re.DOTALL | re.IGNORECASE):
+        macro_name = macro_match.group(1)
+        macro_body = macro_match.group(2)
+        pins = set()
+        pin_pattern = r'PIN\s+(\S+)\s*\n(.*?)END\s+\1'
+        for pin_match in re.finditer(pin_pattern, macro_body, re.DOTALL | re.IGNORECASE):
+            pins.add(pin_match.group(1))
+        if pins:
+            cell_pins[macro_name] = pins
+    return cell_pins
+
+
+SAMPLE_LEF = """\
+VERSION 5.7 ;
+BUSBITCHARS "[]" ;
+
+SITE unithd
+  CLASS CORE ;
+  SIZE 0.46 BY 2.72 ;
+END unithd
+
+MACRO sky130_fd_sc_hd__inv_2
+  CLASS CORE ;
+  SIZE 1.38 BY 2.72 ;
+  PIN A
+    DIRECTION INPUT ;
+    PORT
+      LAYER li1 ;
+        RECT 0.085 1.075 0.430 1.325 ;
+    END
+  END A
+  PIN Y
+    DIRECTION OUTPUT ;
+    PORT
+      LAYER li1 ;
+        RECT 0.525 0.255 0.855 2.465 ;
+    END
+  END Y
+  OBS
+    LAYER li1 ;
+      RECT 0.0 0.0 1.38 2.72 ;
+  END
+END sky130_fd_sc_hd__inv_2
+
+macro sky130_fd_sc_hd__DFXTP_1
+  class core ;
+  pin CLK
+    direction input ;
+    port
+      layer li1 ;
+        rect 0.1 0.1 0.2 0.2 ;
+    end
+  end clk
+  pin D
+    direction input ;
+  end d
+  PIN Q
+    DIRECTION OUTPUT ;
+  End Q
+end SKY130_FD_SC_HD__dfxtp_1
+
+MACRO sky130_fd_sc_hd__tapvpwrvgnd_1
+  CLASS CORE WELLTAP ;
+  SIZE 0.46 BY 2.72 ;
+END sky130_fd_sc_hd__tapvpwrvgnd_1
+
+MACRO sky130_fd_sc_hd__conb_1
+  PIN HI
+    DIRECTION OUTPUT ;
+  END hi
+  PIN LO
+    DIRECTION OUTPUT ;
+  END LO
+END SKY130_FD_SC_HD__CONB_1
+
+END LIBRARY
+"""
+
+
+def test_read_lef_pins_matches_regex_parser(tmp_path):
+    lef = tmp_path / "cells.lef"
+    lef.write_text(SAMPLE_LEF)
+
+    got = _read_lef_pins(str(lef))
+    expected = _regex_lef_pins(SAMPLE_LEF)
+
+    assert {name: set(pins) for name, pins in got.items()} == expected
+    # Names keep the spelling from the MACRO / PIN lines
+    assert got['sky130_fd_sc_hd__DFXTP_1'] == {'CLK', 'D', 'Q'}
+    assert got['sky130_fd_sc_hd__conb_1'] == {'HI', 'LO'}
+    assert 'sky130_fd_sc_hd__tapvpwrvgnd_1' not in got
+
+
+def test_read_lef_pins_empty_file(tmp_path):
+    lef = tmp_path / "empty.lef"
+    lef.write_text("")
+    assert _read_lef_pins(str(lef)) == {} == _regex_lef_pins("")
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Checks for the SA knob sweep driver (SA_Knob_Testing/analysis).
+
+The annealer is replaced by a stub and the process pool by an in-process
+map, so these run the real chaining, resume and CSV writer code of
+run_sweep() on the three HPWL_Analysis sweep specs in well under a second.
+"""
+
+import csv
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "SA_Knob_Testing", "analysis"))
+
+import sweep_driver  # noqa: E402
+from HPWL_Analysis_1 import SPEC as GRID_SPEC  # noqa: E402
+from HPWL_Analysis2 import SPEC as REFINE_TEMP_SPEC  # noqa: E402
+from HPWL_Analysis_3 import SPEC as WINDOW_COOLING_SPEC  # noqa: E402
+
+GREEDY = ("greedy",)
+
+
+class _InlineExecutor:
+    """Stands in for the worker pool: runs tasks lazily in this process."""
+
+    def map(self, fn, iterable):
+        return map(fn, iterable)
+
+
+class _StubAnnealer:
+    """
+    Replaces _run_sa. Records (label, start_place) per call and returns a
+    best placement tagged with the label, so chaining can be traced.
+    Raises once fail_at calls have been made, if set.
+    """
+
+    def __init__(self, fail_at=None):
+        self.calls = []
+        self.fail_at = fail_at
+
+    def __call__(self, label, overrides, start_place):
+        if self.fail_at is not None and len(self.calls) == self.fail_at:
+            raise RuntimeError(f"worker failed on {label}")
+        self.calls.append((label, start_place))
+        stats = {"initial_cost": 2.0, "best_cost": 1.0, "iterations": 10}
+        return dict(overrides), stats, 0.0, ("best", label)
+
+
+@pytest.fixture
+def stub_sweep(monkeypatch):
+    monkeypatch.setitem(sweep_driver._worker_state, "greedy_place", GREEDY)
+    monkeypatch.setattr(sweep_driver, "write_map_file", lambda *args, **kwargs: None)
+
+    def run(spec, out_dir, annealer):
+        monkeypatch.setattr(sweep_driver, "_run_sa", annealer)
+        return sweep_driver.run_sweep(dict(spec, out_dir=str(out_dir)),
+                                      inputs={"fabric_db": None},
+                                      executor=_InlineExecutor())
+    return run
+
+
+def _read_rows(csv_path):
+    with open(csv_path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def _n_runs(spec):
+    n = spec.get("seeds", 1)
+    for values in spec["param_grid"].values():
+        n *= len(values)
+    return n
+
+
+def test_warm_start_gate_refine_temp(stub_sweep, tmp_path):
+    annealer = _StubAnnealer()
+    csv_path = stub_sweep(REFINE_TEMP_SPEC, tmp_path, annealer)
+
+    starts = dict(annealer.calls)
+    assert len(starts) == _n_runs(REFINE_TEMP_SPEC)
+    rows = _read_rows(csv_path)
+    assert len(rows) == len(starts)
+
+    # T0 <= warm_start_max_temp chains along prob_refine, restarting cold
+    # across the 0.25 -> 0.50 gap (> warm_start_max_gap); hotter T0 never chains
+    expected_warm = set()
+    for temp in REFINE_TEMP_SPEC["param_grid"]["initial_temp"]:
+        refines = REFINE_TEMP_SPEC["param_grid"]["prob_refine"]
+        for prev, refine in zip(refines, refines[1:]):
+            label = f"refine_temp initial_temp={temp}, prob_refine={refine}, seed=0"
+            prev_label = f"refine_temp initial_temp={temp}, prob_refine={prev}, seed=0"
+            if temp <= REFINE_TEMP_SPEC["warm_start_max_temp"] and refine - prev <= 0.2:
+                expected_warm.add(label)
+                assert starts[label] == ("best", prev_label)
+    assert expected_warm == {
+        "refine_temp initial_temp=25.0, prob_refine=0.7, seed=0",
+        "refine_temp initial_temp=25.0, prob_refine=0.85, seed=0",
+        "refine_temp initial_temp=50.0, prob_refine=0.7, seed=0",
+        "refine_temp initial_temp=50.0, prob_refine=0.85, seed=0",
+    }
+    for label, start in starts.items():
+        if label not in expected_warm:
+            assert start is GREEDY, label
+
+    warm_rows = {(float(r["initial_temp"]), float(r["prob_refine"]))
+                 for r in rows if r["warm_started"] == "True"}
+    assert warm_rows == {(25.0, 0.7), (25.0, 0.85), (50.0, 0.7), (50.0, 0.85)}
+
+
+@pytest.mark.parametrize("spec", [GRID_SPEC, WINDOW_COOLING_SPEC], ids=lambda s: s["name"])
+def test_cold_sweeps_start_from_greedy(stub_sweep, tmp_path, spec):
+    annealer = _StubAnnealer()
+    csv_path = stub_sweep(spec, tmp_path, annealer)
+
+    assert len(annealer.calls) == _n_runs(spec)
+    assert all(start is GREEDY for _, start in annealer.calls)
+    assert len(_read_rows(csv_path)) == _n_runs(spec)
+
+
+def test_completed_runs(tmp_path):
+    csv_path = tmp_path / "results.csv"
+    assert sweep_driver._completed_runs(csv_path, ("cooling_rate", "seed")) == set()
+
+    csv_path.write_text("cooling_rate,seed,final_hpwl\n"
+                        "0.9,0,10.5\n"
+                        "0.95,1,11.0\n"
+                        ",2,12.0\n")
+    # Rows missing a resume key are not counted as done
+    assert sweep_driver._completed_runs(csv_path, ("cooling_rate", "seed")) == {
+        (0.9, 0.0), (0.95, 1.0)}
+
+
+def test_resume_skips_completed_runs(stub_sweep, tmp_path):
+    csv_path = stub_sweep(GRID_SPEC, tmp_path, _StubAnnealer())
+    rows = _read_rows(csv_path)
+    total = len(rows)
+
+    # Keep the header and the first ten rows, as after an interrupted sweep
+    with open(csv_path) as f:
+        lines = f.readlines()
+    with open(csv_path, "w") as f:
+        f.writelines(lines[:11])
+
+    annealer = _StubAnnealer()
+    stub_sweep(GRID_SPEC, tmp_path, annealer)
+
+    assert len(annealer.calls) == total - 10
+    resumed = _read_rows(csv_path)
+    key = lambda r: (r["cooling_rate"], r["moves_per_temp"], r["seed"])
+    assert len(resumed) == total
+    assert sorted(map(key, resumed)) == sorted(map(key, rows))
+
+
+def test_writer_flushes_rows_when_worker_raises(stub_sweep, tmp_path):
+    # More than ROW_BATCH rows finish before the failure, so one batch is
+    # already written and the rest is still pending in the writer thread
+    fail_at = sweep_driver.ROW_BATCH + 1
+    assert fail_at < _n_runs(WINDOW_COOLING_SPEC)
+
+    with pytest.raises(RuntimeError, match="worker failed"):
+        stub_sweep(WINDOW_COOLING_SPEC, tmp_path, _StubAnnealer(fail_at=fail_at))
+
+    csv_path = tmp_path / WINDOW_COOLING_SPEC["csv_name"]
+    assert len(_read_rows(csv_path)) == fail_at
+
+    # The flushed rows are picked up as done on the next run
+    annealer = _StubAnnealer()
+    stub_sweep(WINDOW_COOLING_SPEC, tmp_path, annealer)
+    assert len(annealer.calls) == _n_runs(WINDOW_COOLING_SPEC) - fail_at
+    assert len(_read_rows(csv_path)) == _n_runs(WINDOW_COOLING_SPEC)
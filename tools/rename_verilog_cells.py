@@ -20,6 +20,9 @@ import os
 import re
 from typing import Dict, Tuple
 
+# Cell instantiation line: indent, cell type, instance name, then "("
+_INSTANCE_RE = re.compile(r'^(\s+)(\w+(?:::\w+)*)\s+(\S+)\s+\(')
+
 
 def load_placement_map(placement_file: str) -> Dict[str, str]:
     """
@@ -78,8 +81,9 @@ def rename_cells_in_verilog(verilog_content: str, placement_map: Dict[str, str])
     renamed_count = 0
     unmapped_count = 0
     
+    match_instance = _INSTANCE_RE.match
     for line in lines:
-        match = re.match(r'^(\s+)(\w+(?:::\w+)*)\s+(\S+)\s+\(', line)
+        match = match_instance(line)
         if match:
             total_cells += 1
             whitespace = match.group(1)
@@ -106,6 +110,63 @@ def rename_cells_in_verilog(verilog_content: str, placement_map: Dict[str, str])
     return renamed_verilog, stats
 
 
+def default_output_path(verilog_file: str) -> str:
+    """Default renamed-netlist path: input_renamed.v next to the input."""
+    base, ext = os.path.splitext(verilog_file)
+    return f"{base}_renamed{ext}"
+
+
+def rename_verilog(verilog_file: str, placement_file: str, output_file: str = None,
+                   verbose: bool = False) -> Tuple[str, Dict[str, int]]:
+    """
+    Rename cell instances in a Verilog file and write the result.
+
+    Args:
+        verilog_file: Path to input Verilog file
+        placement_file: Path to placement .map file
+        output_file: Output Verilog file (default: input_renamed.v)
+        verbose: Print detailed progress
+
+    Returns:
+        Tuple of (renamed_verilog, rename_stats)
+
+    Raises:
+        FileNotFoundError: if either input file is missing
+    """
+    for path in (verilog_file, placement_file):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+
+    if verbose:
+        print(f"Loading placement map: {placement_file}")
+    placement_map = load_placement_map(placement_file)
+    if verbose:
+        print(f"  Loaded {len(placement_map)} cell mappings")
+
+    if verbose:
+        print(f"Reading Verilog: {verilog_file}")
+    with open(verilog_file, 'r') as f:
+        verilog_content = f.read()
+
+    if verbose:
+        print("Renaming cell instances...")
+    renamed_verilog, stats = rename_cells_in_verilog(verilog_content, placement_map)
+    if verbose:
+        print(f"  Total cell instantiations: {stats['total_cells']}")
+        print(f"  Renamed: {stats['renamed_cells']}")
+        print(f"  Unmapped: {stats['unmapped_cells']}")
+
+    if output_file is None:
+        output_file = default_output_path(verilog_file)
+
+    if verbose:
+        print(f"Writing output: {output_file}")
+    with open(output_file, 'w') as f:
+        f.write(renamed_verilog)
+
+    return renamed_verilog, stats
+
+
 def main():
     parser = argparse.ArgumentParser(description="Rename cell instances in Verilog from logical names to fabric placement names")
     parser.add_argument("--verilog", required=True, help="Path to input Verilog file")
@@ -121,33 +182,10 @@ def main():
         print(f"Error: Placement file not found: {args.placement}")
         return 1
 
-    if args.verbose:
-        print(f"Loading placement map: {args.placement}")
-    placement_map = load_placement_map(args.placement)
-    if args.verbose:
-        print(f"  Loaded {len(placement_map)} cell mappings")
-
-    if args.verbose:
-        print(f"Reading Verilog: {args.verilog}")
-    with open(args.verilog, 'r') as f:
-        verilog_content = f.read()
-
-    if args.verbose:
-        print("Renaming cell instances...")
-    renamed_verilog, stats = rename_cells_in_verilog(verilog_content, placement_map)
-    if args.verbose:
-        print(f"  Total cell instantiations: {stats['total_cells']}")
-        print(f"  Renamed: {stats['renamed_cells']}")
-        print(f"  Unmapped: {stats['unmapped_cells']}")
-
     if args.output is None:
-        base, ext = os.path.splitext(args.verilog)
-        args.output = f"{base}_renamed{ext}"
+        args.output = default_output_path(args.verilog)
 
-    if args.verbose:
-        print(f"Writing output: {args.output}")
-    with open(args.output, 'w') as f:
-        f.write(renamed_verilog)
+    _, stats = rename_verilog(args.verilog, args.placement, args.output, verbose=args.verbose)
 
     print(f"✓ Successfully renamed {stats['renamed_cells']} cells")
     print(f"  Output: {args.output}")